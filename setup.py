@@ -116,6 +116,16 @@ setup(name='zope.app.onlinehelp',
               'sphinx_rtd_theme',
           ]
       },
+      entry_points={
+          'console_scripts': [
+              'zope-onlinehelp-prerender ='
+              ' zope.app.onlinehelp.prerender:main',
+              'zope-onlinehelp-store ='
+              ' zope.app.onlinehelp.store:main',
+              'zope-onlinehelp-bundle ='
+              ' zope.app.onlinehelp.bundle:main',
+          ],
+      },
       include_package_data=True,
       zip_safe=False,
       )
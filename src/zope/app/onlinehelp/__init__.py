@@ -19,15 +19,20 @@ Create the global ``OnlineHelp`` instance.
 __docformat__ = 'restructuredtext'
 
 import os
+import threading
+from collections import deque
 
-from zope.component import getUtilitiesFor
 from zope.interface import providedBy
 from zope.proxy import ProxyBase
 from zope.proxy import non_overridable
 from zope.testing import cleanup
 
-from zope.app.onlinehelp.interfaces import IOnlineHelpTopic
+from zope.app.onlinehelp.instrumentation import startTimer
+from zope.app.onlinehelp.instrumentation import stopTimer
 from zope.app.onlinehelp.onlinehelp import OnlineHelp
+from zope.app.onlinehelp.onlinehelp import lookupProvidedTopic
+from zope.app.onlinehelp.onlinehelptopic import finishProbing
+from zope.app.onlinehelp.onlinehelptopic import probeFiles
 
 
 # Global Online Help Instance
@@ -35,6 +40,66 @@ path = os.path.join(os.path.dirname(__file__),
                     'help', 'welcome.stx')
 globalhelp = OnlineHelp('Online Help', path)
 
+# In lazy mode the topics registered by ZCML are only registered with
+# `globalhelp` when the help is used for the first time.
+_lazy = False
+_deferred = deque()
+_materializeLock = threading.Lock()
+
+
+def setLazy(lazy=True):
+    """Turn the lazy mode on or off."""
+    global _lazy
+    _lazy = lazy
+
+
+def isLazy():
+    return _lazy
+
+
+def registerGlobalHelpTopic(*args):
+    """Register a topic with `globalhelp`, unless in lazy mode.
+
+    In lazy mode the registration is deferred until `materialize` is
+    called.
+    """
+    if _lazy:
+        _deferred.append(args)
+    else:
+        globalhelp.registerHelpTopic(*args)
+
+
+def registerGlobalHelpTopics(topics):
+    """Register many topics with `globalhelp`, unless in lazy mode.
+
+    `topics` are tuples of the arguments of `registerGlobalHelpTopic`.
+    """
+    if _lazy:
+        _deferred.extend(topics)
+    else:
+        globalhelp.registerHelpTopics(topics)
+
+
+def materialize():
+    """Register the deferred topics with `globalhelp` in their order.
+
+    Traversing the help namespace and `getTopicFor` call it.
+    """
+    if not _deferred:
+        return
+    with _materializeLock:
+        for args in _deferred:
+            probeFiles(args[3], args[7] or ())
+        try:
+            while _deferred:
+                globalhelp.registerHelpTopic(*_deferred[0])
+                # only removed when registered, so that other threads never
+                # see a partial tree and a failing registration fails every
+                # call instead of leaving its topic out silently
+                _deferred.popleft()
+        finally:
+            finishProbing()
+
 
 class _TraversedOnlineHelpProxy(ProxyBase):
     """
@@ -69,6 +134,7 @@ class helpNamespace:
         Returns a proxy for the global :class:`~.OnlineHelp` instance
         with the traversal context.
         """
+        materialize()
         return _TraversedOnlineHelpProxy(self.context)
 
 
@@ -77,6 +143,11 @@ def getTopicFor(obj, view=None):
 
     Iterate through all directly provided Interfaces and
     see if for the interface (and view) exists a Help Topic.
+    Topics are looked up in the index maintained by
+    :meth:`OnlineHelp.registerHelpTopic
+    <zope.app.onlinehelp.onlinehelp.OnlineHelp.registerHelpTopic>` and
+    memoized per provided interfaces and view, see
+    :func:`~zope.app.onlinehelp.onlinehelp.lookupProvidedTopic`.
 
     Returns the first match.
 
@@ -172,13 +243,17 @@ def getTopicFor(obj, view=None):
     'Help 3'
 
     """
-    for interface in providedBy(obj):
-        for _name, topic in getUtilitiesFor(IOnlineHelpTopic):
-            if topic.interface == interface and topic.view == view:
-                return topic
+    start = startTimer()
+    try:
+        materialize()
+        return lookupProvidedTopic(providedBy(obj), view)
+    finally:
+        stopTimer('getTopicFor', start)
 
 
 def _clear():
+    setLazy(False)
+    _deferred.clear()
     globalhelp.__init__(globalhelp.title, globalhelp.path)
 
 
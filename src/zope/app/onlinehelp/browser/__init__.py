@@ -15,38 +15,209 @@
 """
 __docformat__ = 'restructuredtext'
 
+import hashlib
+from email.utils import formatdate
+from email.utils import parsedate_to_datetime
+
 from zope.app.pagetemplate.viewpagetemplatefile import ViewPageTemplateFile
 from zope.component import createObject
 from zope.component import getMultiAdapter
+from zope.component import queryUtility
 from zope.publisher.browser import BrowserView
 from zope.publisher.interfaces.browser import IBrowserView
 from zope.traversing.api import getName
 from zope.traversing.api import getParent
 
 from zope.app.onlinehelp import getTopicFor
+from zope.app.onlinehelp.browser.tree import getTreeFingerprint
+from zope.app.onlinehelp.browser.tree import preferredLanguages
+from zope.app.onlinehelp.cache import fileSignature
+from zope.app.onlinehelp.cache import renderCache
+from zope.app.onlinehelp.cache import templateCache
+from zope.app.onlinehelp.instrumentation import startTimer
+from zope.app.onlinehelp.instrumentation import stopTimer
+from zope.app.onlinehelp.interfaces import IOnlineHelp
+from zope.app.onlinehelp.prerender import queryPrerendered
+from zope.app.onlinehelp.store import getStore
+
+
+# Help content hardly ever changes, but clients have to ask whether it did.
+CACHE_CONTROL = 'max-age=0, must-revalidate'
+
+# The source types whose rendering does not depend on the language of the
+# request. Their HTML is cached once for all languages.
+LANGUAGE_INDEPENDENT_TYPES = frozenset([
+    'zope.source.plaintext', 'zope.source.stx', 'zope.source.rest'])
+
+
+def requestLanguage(request):
+    """Return the language of the request's locale or None."""
+    locale = getattr(request, 'locale', None)
+    return getattr(getattr(locale, 'id', None), 'language', None)
+
+
+def makeETag(*parts):
+    """Return a quoted entity tag derived from `parts`."""
+    digest = hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+    return '"%s"' % digest[:20]
+
+
+def notModified(request, etag, mtime, cache_control=CACHE_CONTROL):
+    """Set the validators of the response and check the request's.
+
+    `etag` is the quoted entity tag and `mtime` the modification time of
+    the response body. Returns True and sets the status of the response to
+    304 if the copy of the client is still valid.
+
+      >>> from zope.publisher.browser import TestRequest
+      >>> request = TestRequest()
+      >>> notModified(request, '"tag"', 0)
+      False
+      >>> request.response.getHeader('Last-Modified')
+      'Thu, 01 Jan 1970 00:00:00 GMT'
+
+      >>> request = TestRequest(HTTP_IF_NONE_MATCH='"other", W/"tag"')
+      >>> notModified(request, '"tag"', 0)
+      True
+      >>> request.response.getStatus()
+      304
+
+    If-Modified-Since is only used without If-None-Match:
+
+      >>> request = TestRequest(
+      ...     HTTP_IF_MODIFIED_SINCE='Thu, 01 Jan 1970 00:00:01 GMT')
+      >>> notModified(request, '"tag"', 0)
+      True
+      >>> request = TestRequest(
+      ...     HTTP_IF_MODIFIED_SINCE='Thu, 01 Jan 1970 00:00:01 GMT',
+      ...     HTTP_IF_NONE_MATCH='"other"')
+      >>> notModified(request, '"tag"', 0)
+      False
+      >>> request = TestRequest(HTTP_IF_MODIFIED_SINCE='garbage')
+      >>> notModified(request, '"tag"', 0)
+      False
+    """
+    response = request.response
+    response.setHeader('ETag', etag)
+    response.setHeader('Last-Modified', formatdate(int(mtime), usegmt=True))
+    response.setHeader('Cache-Control', cache_control)
+    if getattr(request, 'method', 'GET') not in ('GET', 'HEAD'):
+        return False
+
+    header = request.getHeader('If-None-Match')
+    if header is not None:
+        tags = [tag.strip() for tag in header.split(',')]
+        matched = '*' in tags or etag in [
+            tag[2:] if tag.startswith('W/') else tag for tag in tags]
+    else:
+        header = request.getHeader('If-Modified-Since')
+        if header is None:
+            return False
+        try:
+            since = parsedate_to_datetime(header).timestamp()
+        except (TypeError, ValueError):
+            return False
+        matched = int(mtime) <= since
+
+    if matched:
+        response.setStatus(304)
+    return matched
 
 
 class OnlineHelpTopicView(BrowserView):
     """View for one particular help topic."""
 
+    # The rendered source is cached process-wide, see
+    # `zope.app.onlinehelp.cache.renderCache`, and may come from the
+    # `zope.app.onlinehelp.prerender` directory or the
+    # `zope.app.onlinehelp.store`. Views rendering request specific content
+    # must set this to False.
+    cacheable = True
+
     def topicContent(self):
         """ render the source of the help topic """
+        start = startTimer()
+        try:
+            if not self.cacheable:
+                return self.renderSource()
+            type = self.context.type
+            if type in LANGUAGE_INDEPENDENT_TYPES:
+                language = None
+            else:
+                language = requestLanguage(self.request)
+            key = (self.context.path, type, language)
+            return renderCache.lookup(key, self.context.path, self._render)
+        finally:
+            stopTimer('topicContent', start)
+
+    def _render(self):
+        html = queryPrerendered(self.context)
+        store = getStore()
+        if html is None and store is not None:
+            html = store.queryHTML(self.context)
+        if html is None:
+            html = self.renderSource()
+        return html
+
+    def renderSource(self):
+        """Render the source of the help topic, bypassing the cache."""
         source = createObject(self.context.type, self.context.source)
         view = getMultiAdapter((source, self.request))
         html = view.render()
         return html
 
-    renderTopic = ViewPageTemplateFile('helptopic.pt')
+    template = ViewPageTemplateFile('helptopic.pt')
+
+    def renderTopic(self):
+        """Render the topic page unless the client's copy is still valid.
+        """
+        if self.cacheable:
+            mtime_ns, size = fileSignature(self.context.path)
+            onlinehelp = queryUtility(IOnlineHelp, 'OnlineHelp')
+            tree = getTreeFingerprint(onlinehelp) if onlinehelp else None
+            etag = makeETag(self.context.getTopicPath(), self.context.title,
+                            mtime_ns, size, self.context.type, tree,
+                            preferredLanguages(self.request))
+            if notModified(self.request, etag, mtime_ns / 1e9):
+                return b''
+        return self.template()
+
+
+class BundleOnlineHelpTopicView(OnlineHelpTopicView):
+    """View for a topic stored in a help bundle.
+
+    The HTML of the topic is read from the bundle instead of the render
+    cache.
+    """
+
+    def topicContent(self):
+        """Return the pre-rendered HTML of the help topic."""
+        start = startTimer()
+        try:
+            html = self.context.html if self.cacheable else None
+            if html is None:
+                html = self.renderSource()
+            return html
+        finally:
+            stopTimer('topicContent', start)
+
+
+def getTopicTemplate(path):
+    """Return the page template of the topic in the file at `path`."""
+    return templateCache.lookup(
+        path, path, lambda: ViewPageTemplateFile(path))
 
 
 class ZPTOnlineHelpTopicView(BrowserView):
-    """View for a page template based help topic."""
+    """View for a page template based help topic.
+
+    The page templates are compiled once and kept in
+    `zope.app.onlinehelp.cache.templateCache` until their file changes.
+    """
 
     def renderTopic(self):
         """Render the registred topic."""
-        path = self.context.path
-        view = ViewPageTemplateFile(path)
-        return view(self)
+        return getTopicTemplate(self.context.path)(self)
 
 
 class ContextHelpView(BrowserView):
@@ -79,6 +250,14 @@ class ContextHelpView(BrowserView):
         if self.topic is not None:
             return self.topic
 
+        start = startTimer()
+        try:
+            self._findContextHelpTopic()
+        finally:
+            stopTimer('getContextHelpTopic', start)
+        return self.topic
+
+    def _findContextHelpTopic(self):
         onlinehelp = self.context
         help_context = onlinehelp.context
         self.topic = None
@@ -98,6 +277,4 @@ class ContextHelpView(BrowserView):
         if self.topic is None:
             self.topic = onlinehelp
 
-        return self.topic
-
     contextHelpTopic = property(getContextHelpTopic)
@@ -0,0 +1,182 @@
+##############################################################################
+#
+# Copyright (c) 2026 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""`OnlineHelpResource` views
+
+The resources of help topics are served from their files in chunks, so the
+memory needed for a download does not depend on the size of the resource.
+
+"""
+__docformat__ = 'restructuredtext'
+
+import os
+import re
+
+from zope.interface import implementer
+from zope.publisher.browser import BrowserView
+from zope.publisher.interfaces.http import IResult
+from zope.security.proxy import removeSecurityProxy
+
+from zope.app.onlinehelp.browser import makeETag
+from zope.app.onlinehelp.browser import notModified
+from zope.app.onlinehelp.onlinehelptopic import DEFAULT_ENCODING
+
+
+# Size of the chunks in which resources are delivered.
+CHUNK_SIZE = 64 * 1024
+
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def parseRange(header, size):
+    """Return the part of a resource of `size` bytes a Range header asks for.
+
+    The part is returned as a (start, end) tuple where `end` is exclusive:
+
+      >>> parseRange('bytes=0-99', 1000)
+      (0, 100)
+      >>> parseRange('bytes=900-', 1000)
+      (900, 1000)
+      >>> parseRange('bytes=-100', 1000)
+      (900, 1000)
+      >>> parseRange('bytes=900-2000', 1000)
+      (900, 1000)
+
+    None is returned if the whole resource should be delivered because
+    there is no header or because it is invalid or asks for several ranges:
+
+      >>> parseRange(None, 1000) is None
+      True
+      >>> parseRange('bytes=10-5', 1000) is None
+      True
+      >>> parseRange('bytes=0-1,5-6', 1000) is None
+      True
+      >>> parseRange('bytes=-', 1000) is None
+      True
+
+    ValueError is raised if the range cannot be satisfied:
+
+      >>> parseRange('bytes=1000-', 1000)
+      Traceback (most recent call last):
+      ...
+      ValueError: bytes=1000-
+      >>> parseRange('bytes=-0', 1000)
+      Traceback (most recent call last):
+      ...
+      ValueError: bytes=-0
+    """
+    match = _RANGE.match((header or '').strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        suffix = int(last)
+        if not suffix:
+            raise ValueError(header)
+        return (max(size - suffix, 0), size)
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError(header)
+    end = int(last) + 1 if last else size
+    return (start, min(end, size))
+
+
+@implementer(IResult)
+class FileResult:
+    """Iterate over the bytes from `start` to `end` of a file in chunks.
+
+    The file is opened when the iteration starts and closed when it is
+    exhausted.
+    """
+
+    def __init__(self, path, start, end, chunk_size=CHUNK_SIZE):
+        self.path = path
+        self.start = start
+        self.end = end
+        self.chunk_size = chunk_size
+
+    def __iter__(self):
+        remaining = self.end - self.start
+        with open(self.path, 'rb') as f:
+            f.seek(self.start)
+            while remaining > 0:
+                chunk = f.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+
+class OnlineHelpResourceView(BrowserView):
+    """Deliver a help topic resource."""
+
+    def show(self):
+        """Stream the resource, honouring a single byte range."""
+        response = self.request.response
+        path, offset, size, st = self._location()
+        etag = makeETag(path, offset, st.st_mtime_ns, size,
+                        self.context.contentType)
+        if notModified(self.request, etag, st.st_mtime):
+            return b''
+
+        content_type = self.context.contentType
+        if content_type.startswith('text/') and 'charset' not in content_type:
+            # the bytes of the file are sent, not the decoded data; the
+            # encoding is not part of the interface
+            content_type += ';charset=%s' % getattr(
+                removeSecurityProxy(self.context), '_encoding',
+                DEFAULT_ENCODING)
+        response.setHeader('Content-Type', content_type)
+        response.setHeader('Accept-Ranges', 'bytes')
+
+        header = self.request.getHeader('Range')
+        if_range = self.request.getHeader('If-Range')
+        if if_range is not None and if_range.strip() != etag:
+            # the client's part is outdated, send the whole resource
+            header = None
+        try:
+            part = parseRange(header, size)
+        except ValueError:
+            response.setStatus(416)
+            response.setHeader('Content-Range', 'bytes */%d' % size)
+            response.setHeader('Content-Length', '0')
+            return b''
+
+        if part is None:
+            start, end = 0, size
+        else:
+            start, end = part
+            response.setStatus(206)
+            response.setHeader(
+                'Content-Range', 'bytes %d-%d/%d' % (start, end - 1, size))
+        response.setHeader('Content-Length', str(end - start))
+        return FileResult(path, offset + start, offset + end)
+
+    def _location(self):
+        # The file of the resource, the position and size of the resource
+        # in it and the stat of the file.
+        path = os.path.normpath(self.context.path)
+        st = os.stat(path)
+        return path, 0, st.st_size, st
+
+
+class BundleResourceView(OnlineHelpResourceView):
+    """Deliver a resource stored in a help bundle."""
+
+    def _location(self):
+        path = os.path.normpath(self.context.path)
+        return path, self.context.offset, self.context.getSize(), os.stat(path)
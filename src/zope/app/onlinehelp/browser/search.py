@@ -0,0 +1,47 @@
+##############################################################################
+#
+# Copyright (c) 2026 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""Search view of the OnlineHelp
+"""
+__docformat__ = 'restructuredtext'
+
+from zope.i18n import translate
+from zope.publisher.browser import BrowserView
+
+from zope.app.onlinehelp.search import searchIndex
+
+
+class SearchView(BrowserView):
+    """Search the registered help topics."""
+
+    # Maximum number of results shown
+    limit = 50
+
+    @property
+    def query(self):
+        query = self.request.form.get('q', '')
+        if isinstance(query, list):
+            # the parameter was given more than once
+            query = ' '.join(query)
+        return query.strip()
+
+    def results(self):
+        """Return the title and URL of the topics matching the query."""
+        results = []
+        for topic in searchIndex.search(self.query, self.limit):
+            results.append({
+                'title': translate(topic.title, context=self.request,
+                                   default=topic.title),
+                'url': '/++help++/' + topic.getTopicPath(),
+            })
+        return results
@@ -15,13 +15,20 @@
 
 """
 import os
+import time
 import unittest
+from unittest import mock
 
 import transaction
 from webtest import TestApp
+from zope.configuration import xmlconfig
 from zope.site.interfaces import IRootFolder
 
 from zope.app.onlinehelp import globalhelp
+from zope.app.onlinehelp.browser import warmup
+from zope.app.onlinehelp.cache import renderCache
+from zope.app.onlinehelp.instrumentation import addSink
+from zope.app.onlinehelp.instrumentation import removeSink
 from zope.app.onlinehelp.testing import OnlineHelpLayer
 from zope.app.onlinehelp.tests.test_onlinehelp import testdir
 
@@ -126,6 +133,323 @@ class TestBrowser(BrowserTestCase):
         self.checkForBrokenLinks(body, path, basic='mgr:mgrpw')
 
 
+class TestTopicNotModified(BrowserTestCase):
+
+    path = '/++help++/welcome'
+
+    def test_not_modified(self):
+        response = self._testapp.get(self.path)
+        self.assertIn('Welcome', response.unicode_normal_body)
+        etag = response.headers['ETag']
+        self.assertIn('Last-Modified', response.headers)
+
+        response = self._testapp.get(
+            self.path, headers={'If-None-Match': etag}, status=304)
+        self.assertEqual(b'', response.body)
+
+    def test_tree_changes_etag(self):
+        etag = self._testapp.get(self.path).headers['ETag']
+        globalhelp.registerHelpTopic(
+            '', 'new', 'New', os.path.join(testdir(), 'help.txt'))
+        transaction.commit()
+        self.addCleanup(globalhelp.__delitem__, 'new')
+        response = self._testapp.get(
+            self.path, headers={'If-None-Match': etag}, status=200)
+        self.assertNotEqual(etag, response.headers['ETag'])
+        self.assertIn('New', response.unicode_normal_body)
+
+
+class TestCompactTopics(BrowserTestCase):
+
+    def test_compact(self):
+        from zope.app.onlinehelp.onlinehelptopic import CompactOnlineHelpTopic
+        globalhelp.registerHelpTopic(
+            '', 'compact', 'Compact', os.path.join(testdir(), 'help.txt'),
+            class_=CompactOnlineHelpTopic, resources=['test1.png'])
+        transaction.commit()
+        self.addCleanup(globalhelp.__delitem__, 'compact')
+        response = self.publish('/++help++/compact', basic='mgr:mgrpw')
+        self.assertIn('This is a help!', response.getBody())
+        response = self.publish('/++help++/compact/test1.png',
+                                basic='mgr:mgrpw')
+        self.assertEqual('image/png', response.headers['Content-Type'])
+
+
+class TestBundle(BrowserTestCase):
+
+    def test_bundle(self):
+        import shutil
+        import tempfile
+
+        from zope.app.onlinehelp import bundle
+        from zope.app.onlinehelp.onlinehelp import OnlineHelp
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        filename = os.path.join(directory, 'help.bundle')
+        root = OnlineHelp('Help', testdir())
+        root.registerHelpTopic(
+            '', 'bundled', 'Bundled', os.path.join(testdir(), 'help.txt'),
+            resources=['test1.png'])
+        bundle.buildBundle(filename, root)
+        helpbundle = bundle.HelpBundle(filename)
+        self.addCleanup(helpbundle.close)
+        globalhelp.registerHelpTopics(bundle.bundleTopics(helpbundle))
+        transaction.commit()
+        self.addCleanup(globalhelp.__delitem__, 'bundled')
+
+        response = self.publish('/++help++/bundled', basic='mgr:mgrpw')
+        self.assertIn('This is a help!', response.getBody())
+        response = self.publish('/++help++/bundled/test1.png',
+                                basic='mgr:mgrpw')
+        self.assertEqual('image/png', response.headers['Content-Type'])
+        with open(os.path.join(testdir(), 'test1.png'), 'rb') as f:
+            self.assertEqual(f.read(), response.body)
+
+
+class TestSearch(BrowserTestCase):
+
+    def test_search(self):
+        response = self._testapp.get('/++help++/@@search.html?q=Welcome')
+        body = response.unicode_normal_body
+        self.assertIn('<a href="/++help++/welcome">Welcome</a>', body)
+
+    def test_not_found(self):
+        response = self._testapp.get('/++help++/@@search.html?q=xyzzy')
+        self.assertIn('No topics found.', response.unicode_normal_body)
+
+    def test_repeated_query(self):
+        response = self._testapp.get(
+            '/++help++/@@search.html?q=Welcome&q=Zope')
+        body = response.unicode_normal_body
+        self.assertIn('<a href="/++help++/welcome">Welcome</a>', body)
+
+    def test_empty(self):
+        response = self._testapp.get('/++help++/@@search.html')
+        self.assertNotIn('No topics found.', response.unicode_normal_body)
+
+
+class TestInstrumentation(BrowserTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.measurements = []
+        addSink(self.sink)
+        self.addCleanup(removeSink, self.sink)
+
+    def sink(self, kind, name, value):
+        self.measurements.append((kind, name))
+
+    def test_contexthelp(self):
+        path = '/index.html/++help++/@@contexthelp.html'
+        self.publish(path, basic='mgr:mgrpw')
+        for name in ('getContextHelpTopic', 'getTopicFor', 'topicContent',
+                     'getTopicTree'):
+            self.assertIn(('timer', name), self.measurements)
+        del self.measurements[:]
+        self.publish(path, basic='mgr:mgrpw')
+        self.assertIn(('counter', 'cache.render.hit'), self.measurements)
+        self.assertNotIn(('counter', 'cache.render.miss'), self.measurements)
+
+
+class TestWarmup(BrowserTestCase):
+
+    def setUp(self):
+        super().setUp()
+        renderCache.clear()
+        self.addCleanup(warmup._clear)
+
+    def _warmer(self, **kw):
+        warmer = warmup.Warmer(globalhelp, **kw)
+        warmer.quiet = 0
+        warmer.pause = 0.01
+        return warmer
+
+    def test_warm(self):
+        warmer = self._warmer(threads=2)
+        warmer.start()
+        warmer.join(10)
+        self.assertGreater(warmer.warmed, 1)
+        topic = globalhelp['welcome']
+        self.assertIn((topic.path, topic.type, None), renderCache.keys())
+
+    def test_warmed_for_all_languages(self):
+        warmer = self._warmer(limit=1)
+        warmer.start()
+        warmer.join(10)
+        keys = renderCache.keys()
+        for language in ('en', 'de'):
+            self._testapp.get('/++help++/welcome',
+                              headers={'Accept-Language': language})
+        self.assertEqual(keys, renderCache.keys())
+
+    def test_limit(self):
+        warmer = self._warmer(limit=1)
+        warmer.start()
+        warmer.join(10)
+        self.assertEqual(1, warmer.warmed)
+        self.assertEqual(1, len(renderCache))
+
+    def test_failing_topic(self):
+        warmer = self._warmer(limit=2)
+        with mock.patch.object(warmup, 'warmTopic', side_effect=ValueError):
+            warmer.start()
+            warmer.join(10)
+        self.assertEqual(0, warmer.warmed)
+
+    def test_warmTopic(self):
+        from zope.interface import alsoProvides
+
+        from zope.app.onlinehelp.cache import sourceCache
+        from zope.app.onlinehelp.cache import templateCache
+        from zope.app.onlinehelp.interfaces import IBundleOnlineHelpTopic
+        from zope.app.onlinehelp.onlinehelptopic import OnlineHelpTopic
+        from zope.app.onlinehelp.onlinehelptopic import ZPTOnlineHelpTopic
+
+        zpt = ZPTOnlineHelpTopic(
+            'zpt', 'ZPT', os.path.join(testdir(), 'help.pt'), '')
+        warmup.warmTopic(zpt)
+        self.assertIn(zpt.path, templateCache.keys())
+
+        topic = OnlineHelpTopic(
+            'txt', 'Text', os.path.join(testdir(), 'help.txt'), '')
+        topic.addResources(['help2.txt', 'test1.png'])
+        sourceCache.clear()
+        warmup.warmTopic(topic)
+        self.assertIn((topic.path, topic.type, None), renderCache.keys())
+        self.assertIn(('data', topic['help2.txt'].path), sourceCache.keys())
+
+        # the HTML of bundle topics is already rendered
+        renderCache.clear()
+        alsoProvides(topic, IBundleOnlineHelpTopic)
+        warmup.warmTopic(topic)
+        self.assertEqual(0, len(renderCache))
+
+    def test_paused_under_load(self):
+        warmup.requestStarted(None)
+        warmer = self._warmer()
+        warmer.start()
+        time.sleep(0.05)
+        self.assertEqual(0, warmer.warmed)
+        warmup.requestEnded(None)
+        warmer.join(10)
+        self.assertGreater(warmer.warmed, 0)
+
+    def test_stop(self):
+        warmup.requestStarted(None)
+        warmer = self._warmer()
+        warmer.start()
+        warmer.stop()
+        self.assertEqual(0, warmer.warmed)
+
+    def test_request_events(self):
+        self._testapp.get('/++help++/welcome')
+        self.assertEqual(0, warmup._activeRequests)
+        self.assertGreater(warmup._lastRequest, 0)
+
+    def test_directive(self):
+        xmlconfig.string('''
+            <configure xmlns="http://namespaces.zope.org/zope"
+                       xmlns:help="http://namespaces.zope.org/help">
+              <include package="zope.app.onlinehelp" file="meta.zcml" />
+              <help:warmup threads="2" />
+            </configure>''')
+        self.assertEqual(2, warmup.getWarmer().threads)
+        warmup.stopWarmup()
+        self.assertIsNone(warmup.getWarmer())
+
+
+class TestChildren(BrowserTestCase):
+
+    def test_root(self):
+        response = self._testapp.get('/++help++/@@children.json')
+        self.assertEqual('application/json', response.content_type)
+        children = {child['url']: child for child in response.json}
+        self.assertEqual(
+            {'title': 'Welcome', 'url': '/++help++/welcome',
+             'children': None},
+            children['/++help++/welcome'])
+        self.assertEqual('/++help++/dev/@@children.json',
+                         children['/++help++/dev']['children'])
+
+    def test_topic(self):
+        response = self._testapp.get('/++help++/dev/@@children.json')
+        self.assertEqual(
+            ['/++help++/dev/zope.app.onlinehelp'],
+            [child['url'] for child in response.json])
+
+
+class TestResource(BrowserTestCase):
+
+    path = '/++help++/ui/mgmt-main-1.png'
+
+    def setUp(self):
+        super().setUp()
+        with open(globalhelp['ui']['mgmt-main-1.png'].path, 'rb') as f:
+            self.data = f.read()
+
+    def test_whole(self):
+        response = self.publish(self.path, basic='mgr:mgrpw')
+        self.assertEqual(200, response.getStatus())
+        self.assertEqual('image/png', response.getHeader('Content-Type'))
+        self.assertEqual('bytes', response.getHeader('Accept-Ranges'))
+        self.assertEqual(str(len(self.data)),
+                         response.getHeader('Content-Length'))
+        self.assertEqual(self.data, response.body)
+
+    def test_range(self):
+        response = self.publish(self.path, basic='mgr:mgrpw',
+                                headers={'Range': 'bytes=100-199'})
+        self.assertEqual(206, response.getStatus())
+        self.assertEqual('bytes 100-199/%d' % len(self.data),
+                         response.getHeader('Content-Range'))
+        self.assertEqual(self.data[100:200], response.body)
+
+    def test_unsatisfiable_range(self):
+        response = self._testapp.get(
+            self.path, headers={'Range': 'bytes=%d-' % len(self.data)},
+            status=416)
+        self.assertEqual('bytes */%d' % len(self.data),
+                         response.headers['Content-Range'])
+
+    def test_text(self):
+        from zope.publisher.browser import TestRequest
+
+        from zope.app.onlinehelp.browser.resource import FileResult
+        from zope.app.onlinehelp.browser.resource import OnlineHelpResourceView
+        from zope.app.onlinehelp.onlinehelptopic import OnlineHelpResource
+
+        resource = OnlineHelpResource(os.path.join(testdir(), 'help2.txt'))
+        request = TestRequest()
+        result = OnlineHelpResourceView(resource, request).show()
+        self.assertIsInstance(result, FileResult)
+        self.assertEqual('text/plain;charset=utf-8',
+                         request.response.getHeader('Content-Type'))
+        result.chunk_size = 5
+        chunks = list(result)
+        self.assertEqual(5, len(chunks[0]))
+        self.assertEqual(resource.data, b''.join(chunks).decode('utf-8'))
+
+        # the file is sent as it is, in its own encoding
+        resource._encoding = 'iso-8859-1'
+        request = TestRequest()
+        OnlineHelpResourceView(resource, request).show()
+        self.assertEqual('text/plain;charset=iso-8859-1',
+                         request.response.getHeader('Content-Type'))
+
+    def test_text_published(self):
+        globalhelp.registerHelpTopic(
+            '', 'text', 'Text', os.path.join(testdir(), 'help.txt'),
+            resources=['help2.txt'])
+        globalhelp['text']['help2.txt']._encoding = 'iso-8859-1'
+        transaction.commit()
+        self.addCleanup(globalhelp.__delitem__, 'text')
+        response = self.publish('/++help++/text/help2.txt',
+                                basic='mgr:mgrpw')
+        self.assertEqual('text/plain;charset=iso-8859-1',
+                         response.getHeader('Content-Type'))
+
+
 class TestZPT(unittest.TestCase):
 
     layer = OnlineHelpLayer
@@ -159,6 +483,72 @@ class TestZPT(unittest.TestCase):
         zpt.topicContent = "the topic text"
         zpt.renderTopic()
 
+    def test_template_cached(self):
+        from zope.publisher.browser import TestRequest
+
+        from zope.app.onlinehelp.browser import ZPTOnlineHelpTopicView
+        from zope.app.onlinehelp.cache import templateCache
+        from zope.app.onlinehelp.onlinehelptopic import ZPTOnlineHelpTopic
+
+        templateCache.clear()
+        topic = ZPTOnlineHelpTopic('help', 'Help',
+                                   os.path.join(testdir(), 'help.pt'), '')
+        for _ in range(2):
+            view = ZPTOnlineHelpTopicView(topic, TestRequest())
+            self.assertIn('This is a ZPT help!', view.renderTopic())
+        self.assertEqual([topic.path], templateCache.keys())
+
+
+class TestOnlineHelpTopicView(unittest.TestCase):
+
+    layer = OnlineHelpLayer
+
+    def setUp(self):
+        import shutil
+        import tempfile
+
+        from zope.app.onlinehelp.cache import renderCache
+        renderCache.clear()
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.path = os.path.join(self.tmpdir, 'topic.txt')
+        self._write('First version')
+
+    def _write(self, text):
+        with open(self.path, 'w') as f:
+            f.write(text)
+
+    def _render(self, view_class=None):
+        from zope.publisher.browser import TestRequest
+
+        from zope.app.onlinehelp.browser import OnlineHelpTopicView
+        from zope.app.onlinehelp.onlinehelptopic import OnlineHelpTopic
+
+        topic = OnlineHelpTopic('topic', 'Topic', self.path, '')
+        view = (view_class or OnlineHelpTopicView)(topic, TestRequest())
+        return view.topicContent()
+
+    def test_cached(self):
+        from zope.app.onlinehelp.cache import renderCache
+        self.assertIn('First version', self._render())
+        self.assertEqual(1, len(renderCache))
+
+        # A changed file is rendered again
+        self._write('Second version')
+        os.utime(self.path, ns=(0, 0))
+        self.assertIn('Second version', self._render())
+        self.assertEqual(1, len(renderCache))
+
+    def test_not_cacheable(self):
+        from zope.app.onlinehelp.browser import OnlineHelpTopicView
+        from zope.app.onlinehelp.cache import renderCache
+
+        class UncachedView(OnlineHelpTopicView):
+            cacheable = False
+
+        self.assertIn('First version', self._render(UncachedView))
+        self.assertEqual(0, len(renderCache))
+
 
 class TestContextHelpView(unittest.TestCase):
 
@@ -7,6 +7,8 @@ var nodeExpandClass = "expand";
 var nodeItemClass = "item";
 var nodeLinkClass = "link";
 var activeNodeId = "activeTreeNode";
+// lists with this attribute are loaded from its URL when expanded
+var childrenAttribute = "data-children";
 
 //----------------------------------------------------------------------------
 // public API
@@ -119,6 +121,7 @@ function _renderTreeList(ul) {
                     if (this.parentNode.className == nodeExpandClass) {
                         this.parentNode.className = nodeCollapseClass
                     }else {
+                        _loadChildren(this.parentNode);
                         this.parentNode.className = nodeExpandClass
                     }
                     return false;
@@ -137,4 +140,41 @@ function _renderTreeList(ul) {
     }
 }
 
+function _loadChildren(item) {
+    for (var i=0; i<item.childNodes.length; i++) {
+        var ul = item.childNodes[i];
+        if (ul.nodeName == "UL" && ul.getAttribute(childrenAttribute)) {
+            var url = ul.getAttribute(childrenAttribute);
+            ul.removeAttribute(childrenAttribute);
+            _fetchChildren(ul, url);
+        }
+    }
+}
 
+function _fetchChildren(ul, url) {
+    var request = new XMLHttpRequest();
+    request.open("GET", url, true);
+    request.onload = function () {
+        if (request.status != 200) {
+            // try again when expanded the next time
+            ul.setAttribute(childrenAttribute, url);
+            return;
+        }
+        var children = JSON.parse(request.responseText);
+        for (var i=0; i<children.length; i++) {
+            var li = document.createElement("LI");
+            var a = document.createElement("A");
+            a.href = children[i].url;
+            a.appendChild(document.createTextNode(children[i].title));
+            li.appendChild(a);
+            if (children[i].children) {
+                var sub = document.createElement("UL");
+                sub.setAttribute(childrenAttribute, children[i].children);
+                li.appendChild(sub);
+            }
+            ul.appendChild(li);
+        }
+        _renderTreeList(ul);
+    };
+    request.send();
+}
@@ -16,21 +16,82 @@
 """
 __docformat__ = 'restructuredtext'
 
+import hashlib
+import json
+
 from zope.component import getUtility
 from zope.i18n import translate
+from zope.i18n.interfaces import IUserPreferredLanguages
 from zope.publisher.browser import BrowserView
 from zope.traversing.api import getPath
 from zope.traversing.api import joinPath
 
+from zope.app.onlinehelp.cache import treeCache
+from zope.app.onlinehelp.instrumentation import startTimer
+from zope.app.onlinehelp.instrumentation import stopTimer
 from zope.app.onlinehelp.interfaces import IOnlineHelp
+from zope.app.onlinehelp.onlinehelptopic import getHierarchyGeneration
+
+
+def preferredLanguages(request):
+    """Return the languages preferred by the request as a tuple."""
+    languages = IUserPreferredLanguages(request, None)
+    if languages is None:
+        return ()
+    return tuple(languages.getPreferredLanguages())
+
+
+def topicURL(path):
+    """Return the URL of the topic at `path`."""
+    return '/++help++/' + path
+
+
+def childrenURL(path):
+    """Return the URL of the JSON children of the topic at `path`."""
+    return topicURL(path + '/@@children.json' if path else '@@children.json')
+
+
+def getTreeFingerprint(root):
+    """Return a digest of everything the topic tree below `root` shows.
+
+    Unlike the hierarchy generation the digest is the same in all processes
+    which registered the same topics.
+    """
+    key = (id(root), 'fingerprint')
+    generation = getHierarchyGeneration()
+    cached = treeCache.get(key)
+    if cached is not None and cached[0] == generation:
+        return cached[1]
+    digest = hashlib.sha1()
+    topics = [(0, topic) for topic in reversed(root.getSubTopics())]
+    while topics:
+        level, topic = topics.pop()
+        digest.update(('%d\0%s\0%s\0%s\n' % (
+            level, topic.parentPath, topic.id, topic.title)).encode('utf-8'))
+        topics.extend((level + 1, sub)
+                      for sub in reversed(topic.getSubTopics()))
+    fingerprint = digest.hexdigest()
+    treeCache.set(key, (generation, fingerprint))
+    return fingerprint
 
 
 class OnlineHelpTopicTreeView(BrowserView):
-    """Online help topic tree view."""
+    """Online help topic tree view.
+
+    Only the topics on the path to the context and their siblings are
+    rendered, so the size of the tree does not grow with the number of
+    topics. The lists of the other topics are loaded by ``tree.js`` from
+    their `OnlineHelpTopicChildrenView` when they are expanded.
+
+    The children of each topic are cached per language in
+    `zope.app.onlinehelp.cache.treeCache` until the topic hierarchy
+    changes.
+    """
 
     def __init__(self, context, request):
         super().__init__(context, request)
         self.onlinehelp = getUtility(IOnlineHelp, "OnlineHelp")
+        self._expandedPaths = None
 
     def getTopicTree(self):
         """Return the tree of help topics.
@@ -69,72 +130,114 @@ class OnlineHelpTopicTreeView(BrowserView):
             </li>
           <ul>
         """
-        return self.renderTree(self.onlinehelp)
-
-    def renderTree(self, root):
-        """Reder a unordered list 'ul' tree with a class name 'tree'."""
-        res = []
-        intend = "  "
-        res.append('<ul class="tree" id="tree">')
-        for topic in root.getSubTopics():
-            item = self.renderLink(topic)
-
-            # expand if context is in tree
-            if self.isExpanded(topic):
-                res.append('  <li class="expand">%s' % item)
-            else:
-                res.append('  <li>%s' % item)
+        start = startTimer()
+        try:
+            return self.renderTree(self.onlinehelp)
+        finally:
+            stopTimer('getTopicTree', start)
 
-            if len(topic.getSubTopics()) > 0:
-                res.append(self.renderItemList(topic, intend))
-            res.append('  </li>')
+    def getChildren(self, topic):
+        """Return the children of `topic` as tuples.
 
-        res.append('<ul>')
+        The tuples hold the id, the path and the translated title of a
+        child and whether it has children itself.
+        """
+        key = (id(self.onlinehelp), topic.getTopicPath(),
+               preferredLanguages(self.request))
+        generation = getHierarchyGeneration()
+        cached = treeCache.get(key)
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+        children = tuple(
+            (sub.id, self._topicPath(sub),
+             translate(sub.title, context=self.request, default=sub.title),
+             bool(sub.getSubTopics()))
+            for sub in topic.getSubTopics())
+        treeCache.set(key, (generation, children))
+        return children
 
+    def renderTree(self, root):
+        """Reder a unordered list 'ul' tree with a class name 'tree'."""
+        res = ['<ul class="tree" id="tree">']
+        self._renderItems(root, '', res)
+        res.append('</ul>')
         return '\n'.join(res)
 
     def renderItemList(self, topic, intend):
         """Render a 'ul' elements as childs of the 'ul' tree."""
-        res = []
         intend = intend + "  "
-        res.append('%s<ul>' % intend)
-
-        for item in topic.getSubTopics():
+        res = ['%s<ul>' % intend]
+        self._renderItems(topic, intend, res)
+        res.append('%s</ul>' % intend)
+        return '\n'.join(res)
 
-            # expand if context is in tree
-            if self.isExpanded(topic):
-                res.append('  %s<li class="expand">' % intend)
+    def _renderItems(self, topic, intend, res):
+        for id, path, title, hasChildren in self.getChildren(topic):
+            link = self._renderLink(path, title)
+            if hasChildren and self._isExpandedPath(path):
+                res.append('  %s<li class="expand">%s' % (intend, link))
+                res.append(self.renderItemList(topic[id], intend + "  "))
+            elif hasChildren:
+                # loaded by tree.js when expanded
+                res.append('  %s<li>%s' % (intend, link))
+                res.append('    %s<ul data-children="%s"></ul>'
+                           % (intend, childrenURL(path)))
             else:
-                res.append('  %s<li>' % intend)
-
-            res.append(self.renderLink(item))
-            if len(item.getSubTopics()) > 0:
-                res.append('    {}{}'.format(
-                    self.renderItemList(item, intend), intend))
+                res.append('  %s<li>%s' % (intend, link))
             res.append('  %s</li>' % intend)
-        res.append('%s</ul>' % intend)
-
-        return '\n'.join(res)
 
     def renderLink(self, topic):
         """Render a href element."""
         title = translate(topic.title, context=self.request,
                           default=topic.title)
+        return self._renderLink(self._topicPath(topic), title)
+
+    def _renderLink(self, path, title):
+        return '<a href="{}">{}</a>\n'.format(topicURL(path), title)
+
+    def _topicPath(self, topic):
         if topic.parentPath:
-            url = joinPath(topic.parentPath, topic.id)
-        else:
-            url = topic.id
-        return '<a href="/++help++/{}">{}</a>\n'.format(url, title)
+            return joinPath(topic.parentPath, topic.id)
+        return topic.id
 
     def isExpanded(self, topic):
-        if topic.parentPath:
-            path = joinPath(topic.parentPath, topic.id)
-        else:
-            path = topic.id
+        return self._isExpandedPath(self._topicPath(topic))
+
+    def _isExpandedPath(self, path):
+        if self._expandedPaths is None:
+            self._expandedPaths = self._getExpandedPaths()
+        return path in self._expandedPaths
+
+    def _getExpandedPaths(self):
+        """Return the topic paths which are expanded for the context.
+
+        A topic is expanded if the path of the context starts with the
+        topic path, so these are all the prefixes of the context path.
+        """
         try:
-            if getPath(self.context).startswith('/' + path):
-                return True
-        except:  # noqa: E722 do not use bare 'except'
+            context_path = getPath(self.context)
+        except Exception:
             # TODO: fix it, functional test doesn't like getPath? ri
-            pass
-        return False
+            return frozenset()
+        if not context_path.startswith('/'):
+            return frozenset()
+        return frozenset(context_path[1:end]
+                         for end in range(1, len(context_path) + 1))
+
+
+class OnlineHelpTopicChildrenView(OnlineHelpTopicTreeView):
+    """The children of a topic as JSON, for ``tree.js``.
+
+    Every child is an object with its ``title`` and ``url`` and the URL of
+    its own children as ``children``, which is null for topics without
+    children.
+    """
+
+    def __call__(self):
+        children = [
+            {'title': title,
+             'url': topicURL(path),
+             'children': childrenURL(path) if hasChildren else None}
+            for id, path, title, hasChildren in self.getChildren(self.context)]
+        self.request.response.setHeader('Content-Type', 'application/json')
+        return json.dumps(children)
@@ -0,0 +1,225 @@
+##############################################################################
+#
+# Copyright (c) 2026 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""Warm the caches of the OnlineHelp in the background.
+
+The ``help:warmup`` directive starts a `Warmer` once the configuration is
+complete. Its threads walk the topics of `globalhelp` breadth first, so the
+top level topics come first, and render them into
+`zope.app.onlinehelp.cache.renderCache`, compile the page templates of page
+template based topics and load the data of text resources. At most as many
+topics are warmed as the render cache holds. The HTML of plain text,
+structured text and reStructuredText topics is cached for all languages,
+other source types are warmed for requests without a language only.
+
+In lazy mode (``help:lazy``) the first warming thread registers the
+deferred topics with `zope.app.onlinehelp.materialize`, so the warm-up
+moves the registration into the background instead of deferring it to the
+first use of the help. An error in a deferred registration is raised in
+the warming thread instead of the first request using the help, and stops
+that thread.
+
+The threads run at the lowest scheduling priority where the platform allows
+it. They are paused as soon as a request starts and resume only after no
+request was published for `Warmer.quiet` seconds, so that they never
+compete with real requests.
+
+"""
+__docformat__ = 'restructuredtext'
+
+import os
+import threading
+import time
+from collections import deque
+
+from zope.publisher.browser import TestRequest
+from zope.testing import cleanup
+
+from zope.app.onlinehelp import globalhelp
+from zope.app.onlinehelp import materialize
+from zope.app.onlinehelp.browser import OnlineHelpTopicView
+from zope.app.onlinehelp.browser import getTopicTemplate
+from zope.app.onlinehelp.cache import renderCache
+from zope.app.onlinehelp.instrumentation import count
+from zope.app.onlinehelp.interfaces import IBundleOnlineHelpTopic
+from zope.app.onlinehelp.interfaces import IOnlineHelpResource
+from zope.app.onlinehelp.interfaces import IOnlineHelpTopic
+from zope.app.onlinehelp.interfaces import ISourceTextOnlineHelpTopic
+from zope.app.onlinehelp.interfaces import IZPTOnlineHelpTopic
+
+
+# The number of requests being published and the time the last one ended,
+# maintained by the `requestStarted` and `requestEnded` subscribers.
+_activeRequests = 0
+_lastRequest = 0.0
+_requestLock = threading.Lock()
+
+# The warmer started by ``help:warmup``.
+_warmer = None
+
+
+def requestStarted(event):
+    global _activeRequests
+    with _requestLock:
+        _activeRequests += 1
+
+
+def requestEnded(event):
+    global _activeRequests, _lastRequest
+    with _requestLock:
+        _activeRequests = max(0, _activeRequests - 1)
+        _lastRequest = time.monotonic()
+
+
+def isIdle(quiet):
+    """Return whether no request was published for `quiet` seconds."""
+    return (_activeRequests == 0
+            and time.monotonic() - _lastRequest >= quiet)
+
+
+def _lowerPriority():
+    # only Linux applies the priority to a single thread
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+    except (AttributeError, OSError):
+        pass
+
+
+def iterTopics(root):
+    """Iterate over the topics below `root` breadth first."""
+    topics = deque([root])
+    while topics:
+        for topic in topics.popleft().values():
+            if IOnlineHelpTopic.providedBy(topic):
+                yield topic
+                topics.append(topic)
+
+
+def warmTopic(topic, request=None):
+    """Load everything the page of `topic` needs into the caches."""
+    if request is None:
+        request = TestRequest()
+    if IBundleOnlineHelpTopic.providedBy(topic):
+        # the HTML of bundle topics is not rendered
+        return
+    if ISourceTextOnlineHelpTopic.providedBy(topic):
+        OnlineHelpTopicView(topic, request).topicContent()
+    elif IZPTOnlineHelpTopic.providedBy(topic):
+        getTopicTemplate(topic.path)._cook_check()
+    for resource in topic.values():
+        if (IOnlineHelpResource.providedBy(resource)
+                and resource.contentType.startswith('text/')):
+            resource.data
+
+
+class Warmer:
+    """Warm the topics below `root` in `threads` background threads.
+
+    `limit` bounds the number of topics and defaults to the size of the
+    render cache.
+    """
+
+    # Seconds without requests before the threads resume
+    quiet = 1.0
+
+    # Seconds between the checks of a paused thread
+    pause = 0.1
+
+    def __init__(self, root, threads=1, limit=None):
+        self.root = root
+        self.threads = threads
+        self.limit = renderCache.maxsize if limit is None else limit
+        self.warmed = 0
+        self._topics = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._threads = []
+
+    def start(self):
+        for n in range(self.threads):
+            thread = threading.Thread(
+                target=self._run, name='onlinehelp-warmup-%d' % n,
+                daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """Stop the threads and wait for them."""
+        self._stopped.set()
+        self.join()
+
+    def join(self, timeout=None):
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _next(self):
+        with self._lock:
+            if self._topics is None:
+                # in lazy mode the topics are registered in the background,
+                # see the module docstring
+                materialize()
+                self._topics = zip(range(self.limit), iterTopics(self.root))
+            return next(self._topics, (None, None))[1]
+
+    def _waitForIdle(self):
+        while not isIdle(self.quiet):
+            if self._stopped.wait(self.pause):
+                return False
+        return not self._stopped.is_set()
+
+    def _run(self):
+        _lowerPriority()
+        request = TestRequest()
+        while self._waitForIdle():
+            topic = self._next()
+            if topic is None:
+                return
+            try:
+                warmTopic(topic, request)
+            except Exception:
+                # the topic fails on its request just the same
+                continue
+            with self._lock:
+                self.warmed += 1
+            count('warmup.topics')
+
+
+def startWarmup(threads=1, limit=None):
+    """Start warming the topics of `globalhelp`."""
+    global _warmer
+    stopWarmup()
+    _warmer = Warmer(globalhelp, threads, limit)
+    _warmer.start()
+
+
+def stopWarmup():
+    """Stop warming, if started."""
+    global _warmer
+    if _warmer is not None:
+        _warmer.stop()
+    _warmer = None
+
+
+def getWarmer():
+    """Return the `Warmer` started by `startWarmup` or None."""
+    return _warmer
+
+
+def _clear():
+    global _activeRequests, _lastRequest
+    stopWarmup()
+    _activeRequests = 0
+    _lastRequest = 0.0
+
+
+cleanup.addCleanUp(_clear)
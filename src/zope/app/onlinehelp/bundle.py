@@ -0,0 +1,295 @@
+##############################################################################
+#
+# Copyright (c) 2026 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""Help bundles holding the topics of a help tree in one file.
+
+The ``zope-onlinehelp-bundle`` script loads a ZCML configuration and packs
+the source text topics `globalhelp` holds into one file::
+
+  zope-onlinehelp-bundle site.zcml var/help.bundle
+
+A bundle contains the ids, titles, parent paths, interfaces and views of the
+topics, their source, their pre-rendered HTML and their resources. Page
+template topics are not bundled, they have to be registered with
+``help:register``.
+
+The ``help:bundle`` directive memory-maps the file and registers its topics
+with `globalhelp` as `BundleOnlineHelpTopic`. Their source, HTML and
+resources are read from the mapped file, so no help file is opened at
+startup and the bundle is shared through the page cache by all processes.
+
+The file starts with `MAGIC` and the length of a JSON index as 8 byte
+big-endian integer, followed by the index and the data. The index lists the
+topics in the order of registration with the offsets and lengths of their
+data. Equal data is stored once.
+
+"""
+__docformat__ = 'restructuredtext'
+
+import argparse
+import functools
+import hashlib
+import json
+import mmap
+import os
+import struct
+
+from zope.configuration import xmlconfig
+from zope.configuration.name import resolve
+from zope.i18nmessageid import Message
+from zope.interface import implementer
+from zope.location.interfaces import IContained
+from zope.testing import cleanup
+
+from zope.app.onlinehelp import registerGlobalHelpTopics
+from zope.app.onlinehelp.interfaces import IBundleOnlineHelpResource
+from zope.app.onlinehelp.interfaces import IBundleOnlineHelpTopic
+from zope.app.onlinehelp.interfaces import IOnlineHelpResource
+from zope.app.onlinehelp.interfaces import ISourceTextOnlineHelpTopic
+from zope.app.onlinehelp.onlinehelptopic import DEFAULT_ENCODING
+from zope.app.onlinehelp.onlinehelptopic import SourceTextOnlineHelpTopic
+from zope.app.onlinehelp.prerender import renderText
+from zope.app.onlinehelp.store import walkTopics
+
+
+MAGIC = b'ZOHBUNDLE1\n'
+
+_LENGTH = struct.Struct('>Q')
+
+# The bundles loaded with `loadBundle`, which are closed on cleanup.
+_bundles = []
+
+
+class HelpBundle:
+    """A memory-mapped bundle file."""
+
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < len(MAGIC) + _LENGTH.size:
+                raise ValueError('%s is not a help bundle' % filename)
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError('%s is not a help bundle' % filename)
+        start = len(MAGIC) + _LENGTH.size
+        length, = _LENGTH.unpack(self._map[len(MAGIC):start])
+        index = json.loads(self._map[start:start + length].decode('utf-8'))
+        # the position of the data in the file
+        self.offset = start + length
+        self.topics = index['topics']
+
+    def close(self):
+        self._map.close()
+
+    def read(self, offset, length):
+        """Return `length` bytes of the data at `offset` as bytes."""
+        offset += self.offset
+        return self._map[offset:offset + length]
+
+    def text(self, offset, length):
+        """Return `length` bytes of the data at `offset` decoded."""
+        offset += self.offset
+        with memoryview(self._map) as data:
+            return str(data[offset:offset + length], DEFAULT_ENCODING)
+
+
+@implementer(IBundleOnlineHelpResource, IContained)
+class BundleOnlineHelpResource:
+    """A resource stored in a `HelpBundle`."""
+
+    __slots__ = ('path', 'contentType', 'offset', '_bundle', '_offset',
+                 '_size', '__parent__', '__name__')
+
+    def __init__(self, bundle, contentType, offset, size):
+        self.__parent__ = self.__name__ = None
+        self.path = bundle.filename
+        self.contentType = contentType
+        self.offset = bundle.offset + offset
+        self._bundle = bundle
+        self._offset = offset
+        self._size = size
+
+    @property
+    def data(self):
+        if self.contentType.startswith('text/'):
+            return self._bundle.text(self._offset, self._size)
+        return self._bundle.read(self._offset, self._size)
+
+    def getSize(self):
+        '''See IFile'''
+        return self._size
+
+
+@implementer(IBundleOnlineHelpTopic)
+class BundleOnlineHelpTopic(SourceTextOnlineHelpTopic):
+    """A source text topic stored in a `HelpBundle`.
+
+    Its `path` is the file of the bundle, `entry` is the entry of the topic
+    in the index of the bundle.
+    """
+
+    def __init__(self, id, title, path, parentPath, interface=None,
+                 view=None, bundle=None, entry=None):
+        super().__init__(id, title, path, parentPath, interface, view)
+        self.type = entry['type']
+        self._bundle = bundle
+        self._source = entry['source']
+        self._html = entry['html']
+        for name, contentType, offset, size in entry['resources']:
+            self[name] = BundleOnlineHelpResource(
+                bundle, contentType, offset, size)
+
+    @property
+    def source(self):
+        return self._bundle.text(*self._source)
+
+    @property
+    def html(self):
+        if self._html is None:
+            return None
+        return self._bundle.text(*self._html)
+
+
+def _dottedName(interface):
+    if interface is None:
+        return None
+    return '%s.%s' % (interface.__module__, interface.__name__)
+
+
+def buildBundle(filename, root=None):
+    """Write the source text topics below `root` into the bundle `filename`.
+
+    `root` defaults to `globalhelp`. Returns the paths of the topics which
+    were not bundled.
+    """
+    if root is None:
+        from zope.app.onlinehelp import globalhelp as root
+        from zope.app.onlinehelp import materialize
+        materialize()
+
+    blobs = {}
+    rendered = {}
+
+    def add(data):
+        if not isinstance(data, bytes):
+            data = data.encode(DEFAULT_ENCODING)
+        key = hashlib.sha1(data).digest()
+        blobs.setdefault(key, data)
+        return key
+
+    topics = []
+    skipped = []
+    for topic in walkTopics(root):
+        if not ISourceTextOnlineHelpTopic.providedBy(topic):
+            skipped.append(topic.getTopicPath())
+            continue
+        source = add(topic.source)
+        if IBundleOnlineHelpTopic.providedBy(topic):
+            html = topic.html
+        elif (topic.type, source) in rendered:
+            html = rendered[topic.type, source]
+        else:
+            html = rendered[topic.type, source] = renderText(
+                topic.type, topic.source)
+        topics.append({
+            'parent': topic.parentPath,
+            'id': topic.id,
+            'title': str(topic.title),
+            'domain': getattr(topic.title, 'domain', None),
+            'interface': _dottedName(topic.interface),
+            'view': topic.view,
+            'type': topic.type,
+            'source': source,
+            'html': add(html) if html is not None else None,
+            'resources': [
+                (name, resource.contentType, add(resource.data))
+                for name, resource in topic.items()
+                if IOnlineHelpResource.providedBy(resource)],
+        })
+
+    entries = {}
+    offset = 0
+    for key, data in blobs.items():
+        entries[key] = [offset, len(data)]
+        offset += len(data)
+    for entry in topics:
+        entry['source'] = entries[entry['source']]
+        if entry['html'] is not None:
+            entry['html'] = entries[entry['html']]
+        entry['resources'] = [
+            [name, contentType] + entries[key]
+            for name, contentType, key in entry['resources']]
+    index = json.dumps({'topics': topics}, sort_keys=True).encode('utf-8')
+
+    tmp = filename + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(MAGIC)
+        f.write(_LENGTH.pack(len(index)))
+        f.write(index)
+        for data in blobs.values():
+            f.write(data)
+    # Processes using the old bundle keep their mapping of the old file
+    os.replace(tmp, filename)
+    return skipped
+
+
+def bundleTopics(bundle):
+    """Return the topics of `bundle`.
+
+    The topics are tuples of the arguments of
+    `zope.app.onlinehelp.onlinehelp.OnlineHelp.registerHelpTopic`.
+    """
+    topics = []
+    for entry in bundle.topics:
+        title = entry['title']
+        if entry['domain'] is not None:
+            title = Message(title, domain=entry['domain'])
+        interface = entry['interface']
+        if interface is not None:
+            interface = resolve(interface)
+        factory = functools.partial(
+            BundleOnlineHelpTopic, bundle=bundle, entry=entry)
+        topics.append((entry['parent'], entry['id'], title, bundle.filename,
+                       interface, entry['view'], factory, None))
+    return topics
+
+
+def loadBundle(filename):
+    """Register the topics of the bundle in `filename` with `globalhelp`."""
+    bundle = HelpBundle(filename)
+    _bundles.append(bundle)
+    registerGlobalHelpTopics(bundleTopics(bundle))
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description='Pack the registered help topics into a bundle.')
+    parser.add_argument('zcml', help='the ZCML file configuring the site')
+    parser.add_argument('filename', help='the bundle file')
+    options = parser.parse_args(args)
+
+    xmlconfig.file(os.path.abspath(options.zcml))
+    skipped = buildBundle(options.filename)
+    print('Bundled the help topics into %s' % options.filename)
+    if skipped:
+        print('Not bundled: %s' % ', '.join(skipped))
+
+
+def _clear():
+    # the topics of the bundles are removed by the cleanup of globalhelp
+    while _bundles:
+        _bundles.pop().close()
+
+
+cleanup.addCleanUp(_clear)
@@ -0,0 +1,253 @@
+##############################################################################
+#
+# Copyright (c) 2026 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""Process-wide caches for the OnlineHelp System.
+
+Help topics and their resources are files on disk which hardly ever change
+while a process runs, so everything derived from them (e.g. the rendered
+HTML of a topic) can be cached and revalidated with a cheap ``os.stat``.
+
+"""
+__docformat__ = 'restructuredtext'
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+from zope.testing import cleanup
+
+from zope.app.onlinehelp.instrumentation import count
+
+
+# In frozen mode cached values are not revalidated against their files.
+_frozen = False
+
+
+def setFrozen(frozen=True):
+    """Turn the frozen mode on or off.
+
+    Production sites whose help files never change can save the
+    ``os.stat`` calls needed to revalidate cached values.
+    """
+    global _frozen
+    _frozen = frozen
+
+
+def fileSignature(path):
+    """Return a value which changes whenever the file at `path` changes.
+
+    The signature consists of the modification time and the size of the
+    file:
+
+      >>> from zope.app.onlinehelp.tests.test_onlinehelp import testdir
+      >>> signature = fileSignature(os.path.join(testdir(), 'help.html'))
+      >>> signature[1]
+      20
+    """
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+class LRUCache:
+    """A bounded, thread-safe cache.
+
+    When the cache is full the least recently used entry is evicted.
+
+      >>> cache = LRUCache(2)
+      >>> cache.set('a', 1)
+      >>> cache.set('b', 2)
+      >>> cache.get('a')
+      1
+      >>> cache.set('c', 3)
+      >>> cache.get('b') is None
+      True
+      >>> sorted(cache.keys())
+      ['a', 'c']
+
+    A cache with a size of zero caches nothing:
+
+      >>> cache = LRUCache(0)
+      >>> cache.set('a', 1)
+      >>> len(cache)
+      0
+
+    The cache can also be bounded by the total size of its values, which
+    is computed by `sizeof`:
+
+      >>> cache = LRUCache(maxbytes=10, sizeof=len)
+      >>> cache.set('a', 'x' * 6)
+      >>> cache.set('b', 'x' * 3)
+      >>> cache.nbytes
+      9
+      >>> cache.set('c', 'x' * 4)
+      >>> sorted(cache.keys())
+      ['b', 'c']
+      >>> cache.nbytes
+      7
+
+    Caches with a `name` count their hits and misses as
+    ``cache.<name>.hit`` and ``cache.<name>.miss``, see
+    `zope.app.onlinehelp.instrumentation`.
+    """
+
+    # Marker of missing entries
+    _missing = object()
+
+    def __init__(self, maxsize=1000, maxbytes=None, sizeof=None, name=None):
+        self.maxsize = maxsize
+        self.name = name
+        self._counters = (None if name is None else
+                          ('cache.%s.hit' % name, 'cache.%s.miss' % name))
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof
+        self.nbytes = 0
+        self._data = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def keys(self):
+        with self._lock:
+            return list(self._data)
+
+    def get(self, key, default=None):
+        value = self._get(key)
+        self._count(value is not self._missing)
+        return default if value is self._missing else value
+
+    def _get(self, key):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                return self._missing
+            self._data.move_to_end(key)
+            return value
+
+    def _count(self, hit):
+        if self._counters is not None:
+            count(self._counters[0] if hit else self._counters[1])
+
+    def set(self, key, value):
+        size = self.sizeof(value) if self.sizeof is not None else 0
+        with self._lock:
+            self.nbytes += size - self._sizes.get(key, 0)
+            self._sizes[key] = size
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while self._data and (
+                    len(self._data) > self.maxsize
+                    or (self.maxbytes is not None
+                        and self.nbytes > self.maxbytes)):
+                oldest, _ = self._data.popitem(last=False)
+                self.nbytes -= self._sizes.pop(oldest)
+
+    def invalidate(self, key):
+        with self._lock:
+            if self._data.pop(key, self) is not self:
+                self.nbytes -= self._sizes.pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self.nbytes = 0
+
+    def lookup(self, key, path, factory):
+        """Return the value derived from the file at `path`.
+
+        The value is cached under `key` together with the signature of the
+        file. It is computed by calling `factory` if it is not cached yet or
+        if the file changed since it was cached. In frozen mode, cached
+        values are returned without looking at the file.
+
+          >>> import tempfile
+          >>> with tempfile.NamedTemporaryFile('w', delete=False) as f:
+          ...     _ = f.write('one')
+          >>> def read():
+          ...     with open(f.name) as g:
+          ...         return g.read()
+
+          >>> cache = LRUCache()
+          >>> cache.lookup('key', f.name, read)
+          'one'
+
+        As long as the file does not change, the factory is not called
+        again:
+
+          >>> cache.lookup('key', f.name, lambda: 'not called')
+          'one'
+
+          >>> with open(f.name, 'w') as g:
+          ...     _ = g.write('three')
+          >>> cache.lookup('key', f.name, read)
+          'three'
+
+          >>> setFrozen()
+          >>> with open(f.name, 'w') as g:
+          ...     _ = g.write('four')
+          >>> cache.lookup('key', f.name, read)
+          'three'
+          >>> setFrozen(False)
+
+          >>> os.unlink(f.name)
+        """
+        cached = self._get(key)
+        if _frozen and cached is not self._missing:
+            self._count(True)
+            return cached[1]
+        # Take the signature before computing the value: if the file
+        # changes in between, the next lookup sees a new signature.
+        signature = fileSignature(path)
+        if cached is not self._missing and cached[0] == signature:
+            self._count(True)
+            return cached[1]
+        self._count(False)
+        value = factory()
+        self.set(key, (signature, value))
+        return value
+
+
+def _entrySize(entry):
+    return sys.getsizeof(entry[1])
+
+
+# Decoded source texts of topics and text resources, see
+# `SourceTextOnlineHelpTopic.source` and `OnlineHelpResource.data`.
+sourceCache = LRUCache(10000, maxbytes=32 * 1024 * 1024, sizeof=_entrySize,
+                       name='source')
+
+# Rendered HTML of help topics, see `OnlineHelpTopicView.topicContent`.
+renderCache = LRUCache(500, name='render')
+
+# Page templates of page template based topics, see
+# `ZPTOnlineHelpTopicView.renderTopic`.
+templateCache = LRUCache(500, name='template')
+
+# Children of the topics in the navigation tree, see
+# `OnlineHelpTopicTreeView.getChildren`.
+treeCache = LRUCache(1000, name='tree')
+
+
+def _clear():
+    setFrozen(False)
+    sourceCache.clear()
+    renderCache.clear()
+    templateCache.clear()
+    treeCache.clear()
+
+
+cleanup.addCleanUp(_clear)
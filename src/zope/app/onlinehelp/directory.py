@@ -0,0 +1,185 @@
+##############################################################################
+#
+# Copyright (c) 2026 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""Registration of the help files of a directory tree.
+
+The ``help:registerDirectory`` directive registers every file below a
+directory whose extension is in `TOPIC_EXTENSIONS` as topic, without a
+``help:register`` directive per file. For example::
+
+  help/
+    manifest.json    {"intro": {"title": "Introduction",
+                                "resources": ["diagram.png"]},
+                      "api": "API Reference"}
+    intro.rst
+    api.txt
+    diagram.png
+    api/
+      views.stx
+
+gives the topics ``intro``, ``api`` and ``api/views``:
+
+- The id of a topic is the name of its file without the extension. The
+  topics of a subdirectory are the children of the topic named like the
+  subdirectory.
+
+- The optional `MANIFEST` of a directory is a JSON object mapping the ids
+  of its topics to their titles, or to objects with the ``title`` and the
+  names of the ``resources`` of the topic. Topics missing there use their
+  id as title. The titles are messages of the i18n domain of the
+  directive.
+
+- The files with an extension in `RESOURCE_EXTENSIONS` are resources of the
+  topics listing them in the manifest, like ``diagram.png`` of ``intro``
+  above. Images not listed there are not registered.
+
+The directories are read with `os.scandir`. The result is cached until the
+modification time of the directory or its manifest changes, so files can be
+edited without a new scan, but not added, removed or renamed. Directories
+reached again through symbolic links are skipped.
+
+"""
+__docformat__ = 'restructuredtext'
+
+import json
+import os
+from collections import deque
+
+from zope.configuration.exceptions import ConfigurationError
+from zope.i18nmessageid import Message
+from zope.testing import cleanup
+
+from zope.app.onlinehelp import registerGlobalHelpTopics
+from zope.app.onlinehelp.cache import fileSignature
+from zope.app.onlinehelp.onlinehelptopic import ZPTOnlineHelpTopic
+
+
+TOPIC_EXTENSIONS = ('.stx', '.rst', '.txt', '.pt')
+
+RESOURCE_EXTENSIONS = ('.png', '.gif', '.jpg', '.jpeg', '.svg')
+
+MANIFEST = 'manifest.json'
+
+# Maps directories to the signature of the directory and its manifest and
+# the result of their last scan.
+_scans = {}
+
+
+def _signature(directory, manifest):
+    mtime = os.stat(directory).st_mtime_ns
+    try:
+        return mtime, fileSignature(os.path.join(directory, manifest))
+    except FileNotFoundError:
+        return mtime, None
+
+
+def scan(directory, manifest=MANIFEST):
+    """Return the topic files, resources and subdirectories of `directory`.
+
+    The fourth item of the result is the content of the manifest.
+    """
+    signature = _signature(directory, manifest)
+    cached = _scans.get(directory)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    topics = []
+    resources = []
+    directories = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.startswith('.'):
+                continue
+            if entry.is_dir():
+                directories.append(entry.name)
+                continue
+            extension = os.path.splitext(entry.name)[1].lower()
+            if extension in TOPIC_EXTENSIONS:
+                topics.append(entry.name)
+            elif extension in RESOURCE_EXTENSIONS:
+                resources.append(entry.name)
+    entries = {}
+    if signature[1] is not None:
+        with open(os.path.join(directory, manifest), encoding='utf-8') as f:
+            entries = json.load(f)
+    result = (sorted(topics), sorted(resources), sorted(directories),
+              entries)
+    _scans[directory] = (signature, result)
+    return result
+
+
+def _entry(entries, id):
+    """Return the title and the resources of `id` in a manifest."""
+    entry = entries.get(id, id)
+    if isinstance(entry, dict):
+        return entry.get('title', id), entry.get('resources', ())
+    return entry, ()
+
+
+def scanDirectory(directory, parent='', manifest=MANIFEST, class_=None,
+                  domain=None):
+    """Return the topics of the files below `directory`.
+
+    The topics are tuples of the arguments of
+    `zope.app.onlinehelp.onlinehelp.OnlineHelp.registerHelpTopic`. The
+    topics of `directory` itself are children of the topic at `parent`.
+    Page templates are registered as `ZPTOnlineHelpTopic`, the other files
+    with `class_`. The titles are messages of `domain`, if given.
+    """
+    topics = []
+    visited = set()
+    directories = deque([(directory, parent)])
+    while directories:
+        directory, parent = directories.popleft()
+        st = os.stat(directory)
+        if (st.st_dev, st.st_ino) in visited:
+            continue
+        visited.add((st.st_dev, st.st_ino))
+        names, resources, subdirectories, entries = scan(directory, manifest)
+        resources = set(resources)
+        ids = {}
+        for name in names:
+            id = os.path.splitext(name)[0]
+            if id in ids:
+                raise ConfigurationError(
+                    "Help topics %s and %s in %s have the same id"
+                    % (ids[id], name, directory))
+            ids[id] = name
+            if name.lower().endswith('.pt'):
+                topicClass = ZPTOnlineHelpTopic
+            else:
+                topicClass = class_
+            title, listed = _entry(entries, id)
+            if domain is not None:
+                title = Message(title, domain=domain)
+            topicResources = [resource for resource in listed
+                              if resource in resources]
+            topics.append((parent, id, title, os.path.join(directory, name),
+                           None, None, topicClass, topicResources or None))
+        for name in subdirectories:
+            directories.append((os.path.join(directory, name),
+                                parent + '/' + name if parent else name))
+    return topics
+
+
+def registerHelpDirectory(directory, parent='', manifest=MANIFEST,
+                          class_=None, domain=None):
+    """Register the topics below `directory` with `globalhelp`."""
+    registerGlobalHelpTopics(
+        scanDirectory(directory, parent, manifest, class_, domain))
+
+
+def _clear():
+    _scans.clear()
+
+
+cleanup.addCleanUp(_clear)
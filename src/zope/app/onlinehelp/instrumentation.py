@@ -0,0 +1,121 @@
+##############################################################################
+#
+# Copyright (c) 2026 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""Instrumentation of the OnlineHelp System.
+
+The lookup, rendering and tree building code reports timers and counters
+to the sinks added with `addSink`. A sink is a callable taking the kind of
+the measurement (``'timer'`` or ``'counter'``), its name and its value; the
+values of timers are seconds. The measurements are:
+
+``getTopicFor``
+  timer of `zope.app.onlinehelp.getTopicFor`
+
+``getContextHelpTopic``
+  timer of `zope.app.onlinehelp.browser.ContextHelpView.getContextHelpTopic`
+
+``topicContent``
+  timer of `zope.app.onlinehelp.browser.OnlineHelpTopicView.topicContent`
+
+``getTopicTree``
+  timer of `zope.app.onlinehelp.browser.tree.OnlineHelpTopicTreeView
+  .getTopicTree`
+
+``cache.<name>.hit`` and ``cache.<name>.miss``
+  counters of the caches in `zope.app.onlinehelp.cache`
+
+``warmup.topics``
+  counter of the topics warmed by `zope.app.onlinehelp.browser.warmup`
+
+Without sinks, measuring costs one function call and no clock reads.
+
+"""
+__docformat__ = 'restructuredtext'
+
+from time import perf_counter
+
+from zope.testing import cleanup
+
+
+# Tuple of sinks, so that it can be iterated without locking
+_sinks = ()
+
+
+def addSink(sink):
+    """Report all measurements to `sink`.
+
+      >>> measurements = []
+      >>> def sink(kind, name, value):
+      ...     measurements.append((kind, name, value))
+      >>> addSink(sink)
+      >>> count('cache.test.hit')
+      >>> start = startTimer()
+      >>> stopTimer('test', start)
+      >>> measurements[0]
+      ('counter', 'cache.test.hit', 1)
+      >>> kind, name, value = measurements[1]
+      >>> kind, name, value >= 0
+      ('timer', 'test', True)
+
+    Without sinks nothing is measured:
+
+      >>> removeSink(sink)
+      >>> startTimer() is None
+      True
+      >>> count('cache.test.hit')
+      >>> len(measurements)
+      2
+    """
+    global _sinks
+    _sinks += (sink,)
+
+
+def removeSink(sink):
+    """Stop reporting to `sink`."""
+    global _sinks
+    _sinks = tuple(s for s in _sinks if s != sink)
+
+
+def isEnabled():
+    """Return whether there are sinks."""
+    return bool(_sinks)
+
+
+def emit(kind, name, value):
+    for sink in _sinks:
+        sink(kind, name, value)
+
+
+def count(name, value=1):
+    """Add `value` to the counter `name`."""
+    if _sinks:
+        emit('counter', name, value)
+
+
+def startTimer():
+    """Return the start time for `stopTimer` or None without sinks."""
+    return perf_counter() if _sinks else None
+
+
+def stopTimer(name, start):
+    """Report the seconds since `start` as timer `name`."""
+    if start is not None:
+        emit('timer', name, perf_counter() - start)
+
+
+def _clear():
+    global _sinks
+    _sinks = ()
+
+
+cleanup.addCleanUp(_clear)
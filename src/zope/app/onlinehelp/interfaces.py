@@ -23,6 +23,7 @@ from zope.app.file.interfaces import IFile
 from zope.app.publication.interfaces import IFileContent
 from zope.configuration.fields import GlobalInterface
 from zope.container.interfaces import IContainer
+from zope.interface import Attribute
 from zope.schema import Choice
 from zope.schema import SourceText
 from zope.schema import TextLine
@@ -138,6 +139,15 @@ class IZPTOnlineHelpTopic(IOnlineHelpTopic):
     """Page template based online help topic."""
 
 
+class IBundleOnlineHelpTopic(ISourceTextOnlineHelpTopic):
+    """Source text topic stored in a help bundle.
+
+    See `zope.app.onlinehelp.bundle`.
+    """
+
+    html = Attribute("The pre-rendered HTML of the topic or None.")
+
+
 class IOnlineHelp(ISourceTextOnlineHelpTopic):
     """The root of an onlinehelp hierarchy.
 
@@ -172,6 +182,18 @@ class IOnlineHelp(ISourceTextOnlineHelpTopic):
             Optional.
         """
 
+    def registerHelpTopics(topics):
+        """Register many topics at once.
+
+        :param topics: The topics to register as tuples of the arguments of
+            :meth:`registerHelpTopic` or as mappings of their names to their
+            values.
+
+        The topics are placed and registered as if they were registered one
+        after another, but the files of all topics are checked before any
+        topic is registered.
+        """
+
 
 class IOnlineHelpResource(IFile, IFileContent):
     """A resource, which can be used in a help topic """
@@ -182,3 +204,9 @@ class IOnlineHelpResource(IFile, IFileContent):
                       "in the same directory as the Help Topic"),
         default="",
         required=True)
+
+
+class IBundleOnlineHelpResource(IOnlineHelpResource):
+    """A resource stored in a help bundle."""
+
+    offset = Attribute("The position of the data in the file at `path`.")
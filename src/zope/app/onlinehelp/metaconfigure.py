@@ -13,13 +13,30 @@
 ##############################################################################
 """Meta-Configuration Handlers for "help" namespace.
 
-These handlers process the `registerTopic()` directive of
-the "help" ZCML namespace.
+These handlers process the `registerTopic()`, `topics()`,
+`registerDirectory()`, `prerendered()`, `store()`, `bundle()`, `probing()`,
+`lazy()` and `warmup()` directives of the "help" ZCML namespace.
 
 """
 __docformat__ = 'restructuredtext'
 
-from zope.app.onlinehelp import globalhelp
+import sys
+
+from zope.configuration.config import GroupingContextDecorator
+
+from zope.app.onlinehelp import isLazy
+from zope.app.onlinehelp import registerGlobalHelpTopic
+from zope.app.onlinehelp import registerGlobalHelpTopics
+from zope.app.onlinehelp import setLazy
+from zope.app.onlinehelp.browser.warmup import startWarmup
+from zope.app.onlinehelp.bundle import loadBundle
+from zope.app.onlinehelp.directory import MANIFEST
+from zope.app.onlinehelp.directory import registerHelpDirectory
+from zope.app.onlinehelp.onlinehelptopic import finishProbing
+from zope.app.onlinehelp.onlinehelptopic import probeFiles
+from zope.app.onlinehelp.onlinehelptopic import setProbeThreads
+from zope.app.onlinehelp.prerender import loadPrerendered
+from zope.app.onlinehelp.store import loadStore
 
 
 class OnlineHelpTopicDirective:
@@ -44,9 +61,160 @@ class OnlineHelpTopicDirective:
         return ('registerHelpTopic', self.parent, self.id)
 
     def __call__(self):
+        # The files are probed by the actions before all registrations,
+        # the registrations themselves run in order.
+        self._context.action(
+            discriminator=None,
+            callable=_probeFiles,
+            args=(self.doc_path, self.resources or ()),
+            order=666665,
+        )
         self._context.action(
             discriminator=self._discriminator(),
-            callable=globalhelp.registerHelpTopic,
-            args=self._args(),
+            callable=_register,
+            args=(registerGlobalHelpTopic,) + self._args(),
+            order=666666,
+        )
+        _finishProbing(self._context)
+
+
+class OnlineHelpTopicsDirective:
+
+    def __init__(self, _context, parent="", class_=None):
+        self._context = _context
+        self.parent = parent
+        self.class_ = class_
+        self.topics = []
+
+    def topic(self, _context, id, title, parent=None, doc_path=None,
+              for_=None, view=None, class_=None, resources=None):
+        if parent is None:
+            parent = self.parent
+        if class_ is None:
+            class_ = self.class_
+        _context.action(
+            discriminator=None,
+            callable=_probeFiles,
+            args=(doc_path, resources or ()),
+            order=666665,
+        )
+        # only detects conflicts, the topics are registered together
+        _context.action(
+            discriminator=('registerHelpTopic', parent, id),
+        )
+        self.topics.append(
+            (parent, id, title, doc_path, for_, view, class_, resources))
+
+    def __call__(self):
+        self._context.action(
+            discriminator=None,
+            callable=_register,
+            args=(registerGlobalHelpTopics, self.topics),
             order=666666,
         )
+        _finishProbing(self._context)
+
+
+def _finishProbing(_context):
+    """Queue `finishProbing` after all registrations, once per run."""
+    machine = _context
+    while isinstance(machine, GroupingContextDecorator):
+        machine = machine.context
+    # the index and the action queued last, unless the actions were executed
+    queued = getattr(machine, '_helpFinishProbing', None)
+    actions = machine.actions
+    if (queued is not None and queued[0] < len(actions)
+            and actions[queued[0]] is queued[1]):
+        return
+    _context.action(
+        discriminator=None,
+        callable=finishProbing,
+        order=666667,
+    )
+    machine._helpFinishProbing = (len(actions) - 1, actions[-1])
+
+
+def _register(register, *args):
+    try:
+        register(*args)
+    except BaseException:
+        # the actions after the failing one, including `finishProbing`,
+        # are not executed
+        finishProbing()
+        raise
+
+
+def _probeFiles(doc_path, resources):
+    # deferred topics are probed when they are registered
+    if not isLazy():
+        probeFiles(doc_path, resources)
+
+
+def _i18nDomain(_context):
+    """Return the i18n domain of `_context` as string or None."""
+    domain = getattr(_context, 'i18n_domain', None)
+    if isinstance(domain, bytes):
+        # like zope.configuration.fields.MessageID
+        domain = domain.decode(sys.getfilesystemencoding() or 'utf-8')
+    return domain or None
+
+
+def registerDirectory(_context, directory, parent="", manifest=MANIFEST,
+                      class_=None):
+    _context.action(
+        discriminator=('help:registerDirectory', directory),
+        callable=registerHelpDirectory,
+        args=(directory, parent, manifest, class_,
+              _i18nDomain(_context)),
+        order=666666,
+    )
+
+
+def prerendered(_context, directory):
+    _context.action(
+        discriminator=('help:prerendered',),
+        callable=loadPrerendered,
+        args=(directory,),
+    )
+
+
+def store(_context, file):
+    _context.action(
+        discriminator=('help:store',),
+        callable=loadStore,
+        args=(file,),
+    )
+
+
+def bundle(_context, file):
+    _context.action(
+        discriminator=('help:bundle', file),
+        callable=loadBundle,
+        args=(file,),
+        order=666666,
+    )
+
+
+def probing(_context, threads):
+    _context.action(
+        discriminator=('help:probing',),
+        callable=setProbeThreads,
+        args=(threads,),
+    )
+
+
+def lazy(_context):
+    _context.action(
+        discriminator=('help:lazy',),
+        callable=setLazy,
+    )
+
+
+def warmup(_context, threads=1, limit=None):
+    _context.action(
+        discriminator=('help:warmup',),
+        callable=startWarmup,
+        args=(threads, limit),
+        # after all topics are registered
+        order=666668,
+    )
@@ -21,6 +21,7 @@ from zope.configuration.fields import MessageID
 from zope.configuration.fields import Path
 from zope.configuration.fields import Tokens
 from zope.interface import Interface
+from zope.schema import Int
 from zope.schema import NativeStringLine
 from zope.schema import TextLine
 
@@ -81,3 +82,138 @@ class IOnlineHelpTopicDirective(Interface):
         value_type=TextLine(),
         required=False
     )
+
+
+class IOnlineHelpTopicsDirective(Interface):
+    """Register many online help topics at once.
+
+    The topics are given by ``topic`` subdirectives and registered in one
+    batch, which is faster than registering them one by one.
+    """
+
+    parent = NativeStringLine(
+        title="Parent Topic",
+        description="Id of the parent of topics without a parent.",
+        default="",
+        required=False)
+
+    class_ = GlobalObject(
+        title="Factory",
+        description="The topic class of topics without a class.",
+        required=False,
+    )
+
+
+class ITopicSubdirective(IOnlineHelpTopicDirective):
+    """Register one of the topics of ``topics``."""
+
+    parent = NativeStringLine(
+        title="Parent Topic",
+        description="Id of the parent topic.",
+        required=False)
+
+
+class IRegisterDirectoryDirective(Interface):
+    """Register the help files of a directory tree as topics.
+
+    See `zope.app.onlinehelp.directory` for the layout of the directory.
+    """
+
+    directory = Path(
+        title="Directory",
+        description="The directory containing the help files.",
+        required=True)
+
+    parent = NativeStringLine(
+        title="Parent Topic",
+        description="Id of the parent of the topics of the directory.",
+        default="",
+        required=False)
+
+    manifest = NativeStringLine(
+        title="Manifest",
+        description="The name of the files giving the titles and the"
+                    " resources of the topics of their directory.",
+        default="manifest.json",
+        required=False)
+
+    class_ = GlobalObject(
+        title="Factory",
+        description="The topic class of the files other than page"
+                    " templates.",
+        required=False,
+    )
+
+
+class IPrerenderedDirective(Interface):
+    """Serve help topics pre-rendered by ``zope-onlinehelp-prerender``."""
+
+    directory = Path(
+        title="Directory",
+        description="The directory the topics were pre-rendered into.",
+        required=True)
+
+
+class IStoreDirective(Interface):
+    """Use the store built by ``zope-onlinehelp-store``."""
+
+    file = Path(
+        title="File",
+        description="The store file.",
+        required=True)
+
+
+class IBundleDirective(Interface):
+    """Register the topics of a bundle built by ``zope-onlinehelp-bundle``.
+    """
+
+    file = Path(
+        title="File",
+        description="The bundle file.",
+        required=True)
+
+
+class IProbingDirective(Interface):
+    """Probe the files of the registered topics in parallel.
+
+    The existence of the topic files is checked and the resources are
+    sniffed by a pool of threads before the topics are registered.
+    """
+
+    threads = Int(
+        title="Threads",
+        description="The number of threads probing files, 0 turns it off.",
+        min=0,
+        required=True)
+
+
+class ILazyDirective(Interface):
+    """Register the topics with the global help when it is used first.
+
+    The topics registered by ``help:register`` are only created when the
+    help namespace is traversed or a topic is looked up by ``getTopicFor``
+    for the first time.
+    """
+
+
+class IWarmupDirective(Interface):
+    """Warm the caches of the global help in the background.
+
+    Once the configuration is complete, background threads render the
+    topics into the render cache while no requests are published. Topics
+    deferred by ``help:lazy`` are registered by the warm-up.
+    """
+
+    threads = Int(
+        title="Threads",
+        description="The number of threads warming topics.",
+        min=1,
+        default=1,
+        required=False)
+
+    limit = Int(
+        title="Limit",
+        description="The maximum number of topics to warm, by default as"
+                    " many as the render cache holds.",
+        min=0,
+        required=False)
@@ -19,18 +19,163 @@ This is the default implementation of the `OnlineHelp`. It defines the global
 """
 __docformat__ = 'restructuredtext'
 
-import os
+
+from collections.abc import Mapping
 
 from zope.component import getGlobalSiteManager
+from zope.component import getSiteManager
 from zope.component import getUtilitiesFor
 from zope.configuration.exceptions import ConfigurationError
 from zope.interface import implementer
+from zope.testing import cleanup
 from zope.traversing.api import traverse
 from zope.traversing.interfaces import IContainmentRoot
 
 from zope.app.onlinehelp.interfaces import IOnlineHelp
 from zope.app.onlinehelp.interfaces import IOnlineHelpTopic
 from zope.app.onlinehelp.onlinehelptopic import OnlineHelpTopic
+from zope.app.onlinehelp.onlinehelptopic import fileExists
+from zope.app.onlinehelp.search import searchIndex
+
+
+# Indexes over the topics registered through `OnlineHelp.registerHelpTopic`.
+# Like the `IOnlineHelpTopic` utilities they mirror, they are shared by all
+# `OnlineHelp` instances.
+#
+# `_topicsByPath` maps topic paths to topics, `_topicsByParentPath` maps
+# parent paths and `_topicsByBinding` maps (interface, view) pairs to the
+# topics registered for them. All of them are ordered like
+# ``getUtilitiesFor(IOnlineHelpTopic)`` returns the topics, a topic
+# registered again moves to the end, so the indexes yield the same results
+# as scanning the utilities.
+_topicsByPath = {}
+_topicsByParentPath = {}
+_topicsByBinding = {}
+
+# Memo of `lookupProvidedTopic` mapping (specification, view) pairs to the
+# interface resolution order of the specification and the topic found. It
+# is emptied whenever a topic is indexed; `_bindingGeneration` counts these
+# changes, so that lookups running concurrently do not memoize stale topics.
+_topicsBySpecification = {}
+_bindingGeneration = 0
+
+# Bounds the number of memoized (specification, view) pairs.
+MEMO_SIZE = 10000
+
+# The utility registry of the global site manager, its generation when it
+# was last compared to `_topicsByPath` and whether they matched.
+_checkedUtilities = (None, None, False)
+
+
+def _indexTopics(topics):
+    global _bindingGeneration
+    for topic in topics:
+        path = topic.getTopicPath()
+        old = _topicsByPath.pop(path, None)
+        if old is not None:
+            del _topicsByParentPath[old.parentPath][path]
+            del _topicsByBinding[(old.interface, old.view)][path]
+        _topicsByPath[path] = topic
+        _topicsByParentPath.setdefault(topic.parentPath, {})[path] = topic
+        _topicsByBinding.setdefault(
+            (topic.interface, topic.view), {})[path] = topic
+    _bindingGeneration += 1
+    _topicsBySpecification.clear()
+
+
+def _indexComplete():
+    # Whether the indexes hold exactly the `IOnlineHelpTopic` utilities of
+    # the current site manager. Topics registered as utilities without
+    # `registerHelpTopic` or in local sites are not indexed, they are only
+    # found by scanning the utilities. The global utilities are compared to
+    # the index once per change of their registry.
+    global _checkedUtilities
+    sm = getSiteManager()
+    if sm is not getGlobalSiteManager():
+        return False
+    utilities = sm.utilities
+    registry, generation, complete = _checkedUtilities
+    if registry is utilities and generation == utilities._generation:
+        return complete
+    generation = utilities._generation
+    registered = list(sm.getUtilitiesFor(IOnlineHelpTopic))
+    complete = (len(registered) == len(_topicsByPath)
+                and all(name == path and topic is indexed
+                        for (name, topic), (path, indexed)
+                        in zip(registered, _topicsByPath.items())))
+    _checkedUtilities = (utilities, generation, complete)
+    return complete
+
+
+def _resolveDocPath(doc_path, exists=fileExists):
+    # Return the file of a topic or None, a missing ``.txt`` file may have
+    # been renamed to ``.rst``.
+    if exists(doc_path):
+        return doc_path
+    if doc_path.endswith('.txt') and exists(doc_path[:-4] + '.rst'):
+        return doc_path[:-4] + '.rst'
+    return None
+
+
+def _topicArguments(parent_path, id, title, doc_path, interface=None,
+                    view=None, class_=None, resources=None):
+    return (parent_path, id, title, doc_path, interface, view, class_,
+            resources)
+
+
+def _scanTopics(interface, view):
+    for _name, topic in getUtilitiesFor(IOnlineHelpTopic):
+        if topic.interface == interface and topic.view == view:
+            return topic
+    return None
+
+
+def _indexedTopic(interface, view):
+    for topic in _topicsByBinding.get((interface, view), {}).values():
+        return topic
+    return None
+
+
+def lookupTopic(interface, view=None):
+    """Return the first topic registered for `interface` and `view`.
+
+    Returns None if there is no such topic.
+    """
+    if not _indexComplete():
+        return _scanTopics(interface, view)
+    return _indexedTopic(interface, view)
+
+
+def lookupProvidedTopic(spec, view=None):
+    """Return the first topic registered for an interface in `spec`.
+
+    `spec` is the specification of the interfaces an object provides, the
+    interfaces are tried in its order. The result is memoized per `spec`
+    and `view` until another topic is registered or the interfaces of
+    `spec` change.
+    """
+    if not _indexComplete():
+        for interface in spec:
+            topic = _scanTopics(interface, view)
+            if topic is not None:
+                return topic
+        return None
+    key = (spec, view)
+    cached = _topicsBySpecification.get(key)
+    if cached is not None and cached[0] is spec.__iro__:
+        return cached[1]
+    generation = _bindingGeneration
+    iro = spec.__iro__
+    topic = None
+    for interface in spec:
+        topic = _indexedTopic(interface, view)
+        if topic is not None:
+            break
+    if generation == _bindingGeneration:
+        if len(_topicsBySpecification) >= MEMO_SIZE:
+            _topicsBySpecification.clear()
+        _topicsBySpecification[key] = (iro, topic)
+    return topic
 
 
 @implementer(IOnlineHelp, IContainmentRoot)
@@ -115,6 +260,10 @@ class OnlineHelp(OnlineHelpTopic):
 
     """
 
+    # The class of topics registered without an explicit class, e.g.
+    # `zope.app.onlinehelp.onlinehelptopic.CompactOnlineHelpTopic`
+    topicClass = OnlineHelpTopic
+
     def __init__(self, title, path):
         super().__init__('', title, path, None)
 
@@ -123,18 +272,129 @@ class OnlineHelp(OnlineHelpTopic):
                           class_=None, resources=None):
         "See zope.app.onlineHelp.interfaces.IOnlineHelp"
 
-        if not os.path.exists(doc_path):
-            if (doc_path.endswith('.txt')
-                    and os.path.exists(doc_path[:-4] + '.rst')):
-                doc_path = doc_path[:-4] + '.rst'
-
-        if not os.path.exists(doc_path):
+        resolved = _resolveDocPath(doc_path)
+        if resolved is None:
             raise ConfigurationError(
                 "Help Topic definition %s does not exist" % doc_path
             )
 
+        topic = self._createTopic(parent_path, id, title, resolved,
+                                  interface, view, class_, resources)
+
+        # add topic to onlinehelp hierarchy
+        self._addToParent(topic, self._findParent(parent_path))
+
+        # adopt the children registered before their parent
+        children = _topicsByParentPath.get(topic.getTopicPath(), {})
+        for child in children.values():
+            topic[child.id] = child
+
+        getGlobalSiteManager().registerUtility(
+            topic, IOnlineHelpTopic, topic.getTopicPath())
+        _indexTopics((topic,))
+        searchIndex.add(topic)
+
+    def registerHelpTopics(self, topics):
+        """See zope.app.onlineHelp.interfaces.IOnlineHelp
+
+        The descriptors are tuples or mappings of the arguments of
+        `registerHelpTopic`. The topics end up in the same places as if they
+        were registered one after another, in any order:
+
+        >>> import os
+        >>> from zope import component
+        >>> from zope.app.onlinehelp.tests.test_onlinehelp import testdir
+        >>> from zope.app.onlinehelp.tests.test_onlinehelp import I1
+        >>> path = os.path.join(testdir(), 'help.txt')
+        >>> onlinehelp = OnlineHelp('Help', path)
+        >>> onlinehelp.registerHelpTopics([
+        ...     ('missing', 'help3', 'Help 3', path, I1, 'view.html'),
+        ...     ('', 'help2', 'Help 2', path, I1, 'view.html'),
+        ...     {'parent_path': '', 'id': 'missing', 'title': 'Missing',
+        ...      'doc_path': path}])
+        >>> sorted(onlinehelp.keys())
+        ['help2', 'missing']
+        >>> onlinehelp['missing']['help3'].title
+        'Help 3'
+        >>> component.getUtility(IOnlineHelpTopic, 'missing/help3').title
+        'Help 3'
+
+        All files are checked before any topic is registered:
+
+        >>> try:
+        ...     onlinehelp.registerHelpTopics([
+        ...         ('', 'new', 'New', path),
+        ...         ('', 'bad', 'Bad', 'bad.txt'),
+        ...         ('', 'worse', 'Worse', 'worse.txt')])
+        ... except ConfigurationError as e:
+        ...     print(e)
+        Help Topic definitions bad.txt, worse.txt do not exist
+        >>> 'new' in onlinehelp
+        False
+        """
+        # every file is checked only once
+        exists = {}
+
+        def fileExistsOnce(path):
+            if path not in exists:
+                exists[path] = fileExists(path)
+            return exists[path]
+
+        registrations = []
+        missing = []
+        for descriptor in topics:
+            if isinstance(descriptor, Mapping):
+                args = _topicArguments(**descriptor)
+            else:
+                args = _topicArguments(*descriptor)
+            resolved = _resolveDocPath(args[3], fileExistsOnce)
+            if resolved is None:
+                missing.append(args[3])
+            registrations.append(args[:3] + (resolved,) + args[4:])
+        if len(missing) == 1:
+            raise ConfigurationError(
+                "Help Topic definition %s does not exist" % missing[0])
+        if missing:
+            raise ConfigurationError(
+                "Help Topic definitions %s do not exist" % ', '.join(missing))
+
+        paths = [parent_path + '/' + id if parent_path else id
+                 for parent_path, id in (args[:2] for args in registrations)]
+        if (len(set(paths)) != len(paths)
+                or any(path in _topicsByPath for path in paths)):
+            # a topic registered again does not replace the old one in the
+            # tree, which depends on the order of the registrations
+            for args in registrations:
+                self.registerHelpTopic(*args)
+            return
+
+        created = {path: self._createTopic(*args)
+                   for path, args in zip(paths, registrations)}
+        _indexTopics(created.values())
+
+        # Parents come before their children, so that every topic is added
+        # to the complete tree above it. The children, including those
+        # registered before, are adopted in the order of their registration.
+        parents = {}
+        for path, topic in sorted(created.items(),
+                                  key=lambda item: item[0].count('/')):
+            if topic.parentPath not in created:
+                if topic.parentPath not in parents:
+                    parents[topic.parentPath] = self._findParent(
+                        topic.parentPath)
+                self._addToParent(topic, parents[topic.parentPath])
+            for child in _topicsByParentPath.get(path, {}).values():
+                topic[child.id] = child
+
+        registerUtility = getGlobalSiteManager().registerUtility
+        for path, topic in created.items():
+            registerUtility(topic, IOnlineHelpTopic, path)
+            searchIndex.add(topic)
+
+    def _createTopic(self, parent_path, id, title, doc_path, interface,
+                     view, class_, resources):
         if class_ is None:
-            class_ = OnlineHelpTopic
+            class_ = self.topicClass
 
         # Create topic base on the custom class or OnlinHelpTopic
         topic = class_(id, title, doc_path, parent_path, interface, view)
@@ -142,21 +402,32 @@ class OnlineHelp(OnlineHelpTopic):
         # add resources to topic
         if resources is not None:
             topic.addResources(resources)
+        return topic
 
-        # add topic to onlinehelp hierarchy
-        parent = None
+    def _addToParent(self, topic, parent):
+        if parent is not None:
+            try:
+                parent[topic.id] = topic
+            except KeyError:
+                # the parent keeps a topic registered before under this id
+                pass
+
+    def _findParent(self, parent_path):
         try:
-            parent = traverse(self, parent_path)
-            parent[id] = topic
+            return traverse(self, parent_path)
         except KeyError:
-            pass
+            # the parent may be registered without being traversable yet
+            return _topicsByPath.get(parent_path)
 
-        for t in getUtilitiesFor(IOnlineHelpTopic):
-            if parent is None:
-                if t[1].getTopicPath() == parent_path:
-                    t[1][id] = topic
-            if topic.getTopicPath() == t[1].parentPath:
-                topic[t[1].id] = t[1]
 
-        getGlobalSiteManager().registerUtility(
-            topic, IOnlineHelpTopic, topic.getTopicPath())
+def _clear():
+    global _bindingGeneration, _checkedUtilities
+    _bindingGeneration += 1
+    _checkedUtilities = (None, None, False)
+    _topicsBySpecification.clear()
+    _topicsByPath.clear()
+    _topicsByParentPath.clear()
+    _topicsByBinding.clear()
+
+
+cleanup.addCleanUp(_clear)
@@ -19,14 +19,21 @@
 __docformat__ = 'restructuredtext'
 
 import os
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
 
 from persistent import Persistent
 from zope.app.file.image import getImageInfo
 from zope.configuration.exceptions import ConfigurationError
+from zope.container.contained import setitem
+from zope.container.contained import uncontained
 from zope.container.sample import SampleContainer
 from zope.contenttype import guess_content_type
 from zope.interface import implementer
+from zope.location.interfaces import IContained
+from zope.testing import cleanup
 
+from zope.app.onlinehelp.cache import sourceCache
 from zope.app.onlinehelp.interfaces import IOnlineHelpResource
 from zope.app.onlinehelp.interfaces import IOnlineHelpTopic
 from zope.app.onlinehelp.interfaces import IRESTOnlineHelpTopic
@@ -37,14 +44,163 @@ from zope.app.onlinehelp.interfaces import IZPTOnlineHelpTopic
 
 DEFAULT_ENCODING = "utf-8"
 
+# Number of bytes read from the start of a resource to guess its type.
+SNIFF_SIZE = 8192
+
 try:
     text_type = unicode
 except NameError:
     text_type = str
 
+# Incremented whenever a topic is created or topics or resources are added
+# to or removed from a topic. Caches of anything derived from the topic
+# hierarchy compare against it.
+_hierarchyGeneration = 0
+
+
+def getHierarchyGeneration():
+    """Return a number which changes whenever the topic hierarchy changes.
+    """
+    return _hierarchyGeneration
+
+
+def _hierarchyChanged():
+    global _hierarchyGeneration
+    _hierarchyGeneration += 1
+
+
+# Files of topics registered by ZCML can be probed by a thread pool before
+# the registration actions run, see `probeFiles`.
+_probeThreads = 0
+_probeExecutor = None
+_probes = {}
+
+
+def setProbeThreads(threads):
+    """Probe the files of topics registered by ZCML in `threads` threads.
+
+    Zero turns the probing off.
+    """
+    global _probeThreads
+    _probeThreads = threads
+
+
+def probeFiles(path, resources=()):
+    """Start probing the files of a topic and its resources.
+
+    The registration of the topic then uses the results instead of
+    accessing the files. Does nothing unless `setProbeThreads` was called.
+    """
+    global _probeExecutor
+    if _probeThreads < 1:
+        return
+    if _probeExecutor is None:
+        _probeExecutor = ThreadPoolExecutor(
+            _probeThreads, thread_name_prefix='onlinehelp-probe')
+    paths = [path]
+    if path.endswith('.txt'):
+        paths.append(path[:-4] + '.rst')
+    dirname = os.path.dirname(path)
+    for resource in resources:
+        resource_path = dirname + '/' + resource
+        paths.append(resource_path)
+        if ('sniff', resource_path) not in _probes:
+            _probes['sniff', resource_path] = _probeExecutor.submit(
+                _sniffFile, resource_path)
+    for path in paths:
+        if ('exists', path) not in _probes:
+            _probes['exists', path] = _probeExecutor.submit(
+                os.path.exists, path)
+
+
+def finishProbing():
+    """Forget the probed files and stop the threads."""
+    global _probeExecutor
+    _probes.clear()
+    if _probeExecutor is not None:
+        _probeExecutor.shutdown()
+        _probeExecutor = None
+
+
+def fileExists(path):
+    """Return whether the file at `path` exists."""
+    # a probe is used only once, so that none is kept when the probing is
+    # not finished
+    future = _probes.pop(('exists', path), None)
+    if future is not None:
+        return future.result()
+    return os.path.exists(path)
+
+
+def _sniffFile(path):
+    # Only the start of the file is read, the data is read when it is
+    # accessed.
+    with open(os.path.normpath(path), 'rb') as f:
+        return os.fstat(f.fileno()).st_size, f.read(SNIFF_SIZE)
+
+
+def _clearProbes():
+    setProbeThreads(0)
+    finishProbing()
+
+
+cleanup.addCleanUp(_clearProbes)
+
+
+class _ResourceBase:
+    """Implementation of help topic resources independent of their storage.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, path='', contentType=''):
+        self.path = path
+        future = _probes.pop(('sniff', path), None)
+        if future is not None:
+            self._size, header = future.result()
+        else:
+            self._size, header = _sniffFile(path)
+        self._fileMode = 'rb'
+        encoding = None
+
+        if contentType == '':
+            contentType, encoding = guess_content_type(self.path, header, '')
+
+        if contentType.startswith('image/'):
+            try:
+                contentType = getImageInfo(header)[0]
+            except TypeError:
+                # The header ends within the JPEG markers, which only give
+                # the dimensions we do not need.
+                contentType = 'image/jpeg'
+        self.contentType = contentType
+
+        self._encoding = encoding or DEFAULT_ENCODING
+        if self.contentType.startswith('text/'):
+            self._fileMode = 'r'
+
+    @property
+    def data(self):
+        if self.contentType.startswith('text/'):
+            path = os.path.normpath(self.path)
+            return sourceCache.lookup(('data', path), path, self._readData)
+        return self._readData()
+
+    def _readData(self):
+        with open(os.path.normpath(self.path), self._fileMode) as f:
+            data = f.read()
+        if (self.contentType.startswith('text/')
+                and not isinstance(data, text_type)):
+            data = data.decode(self._encoding)
+        return data
+
+    def getSize(self):
+        '''See IFile'''
+        return self._size
+
 
 @implementer(IOnlineHelpResource)
-class OnlineHelpResource(Persistent):
+class OnlineHelpResource(_ResourceBase, Persistent):
     r"""
     Represents a resource that is used inside
     the rendered Help Topic - for example a screenshot.
@@ -73,41 +229,63 @@ class OnlineHelpResource(Persistent):
     True
     """
 
-    def __init__(self, path='', contentType=''):
+
+class _TopicBase:
+    """Implementation of help topics independent of their storage."""
+
+    __slots__ = ()
+
+    # The class of the resources added by `addResources`
+    resourceClass = OnlineHelpResource
+
+    def __init__(self, id, title, path, parentPath, interface=None, view=None):
+        """Initialize object."""
+        self.id = id
+        self.parentPath = parentPath
+        self.title = title
         self.path = path
-        with open(os.path.normpath(self.path), 'rb') as f:
-            _data = f.read()
-        self._size = len(_data)
-        self._fileMode = 'rb'
-        encoding = None
+        self.interface = interface
+        self.view = view
+        # also when an existing topic is initialized again, see `_clear`
+        self._subTopics = None
 
-        if contentType == '':
-            content_type, encoding = guess_content_type(self.path, _data, '')
+        if not fileExists(self.path):
+            raise ConfigurationError(
+                "Help Topic definition %s does not exist" % self.path
+            )
 
-        if content_type.startswith('image/'):
-            self.contentType, _width, _height = getImageInfo(_data)
-        else:
-            self.contentType = content_type
+        super().__init__()
+        _hierarchyChanged()
 
-        self._encoding = encoding or DEFAULT_ENCODING
-        if self.contentType.startswith('text/'):
-            self._fileMode = 'r'
+    def addResources(self, resources):
+        """ see IOnlineHelpTopic """
+        dirname = os.path.dirname(self.path)
+        for resource in resources:
+            resource_path = dirname + '/' + resource
+            if fileExists(resource_path):
+                self[resource] = self.resourceClass(resource_path)
 
-    @property
-    def data(self):
-        with open(os.path.normpath(self.path), self._fileMode) as f:
-            data = f.read()
-        if (self.contentType.startswith('text/')
-                and not isinstance(data, text_type)):
-            data = data.decode(self._encoding)
-        return data
+    def getTopicPath(self):
+        """See IOnlineHelpTopic"""
+        if self.parentPath:
+            return self.parentPath + '/' + self.id
+        return self.id
 
-    def getSize(self):
-        '''See IFile'''
-        return self._size
+    def getSubTopics(self):
+        """See IOnlineHelpTopic
+
+        The topics are kept until a child is added or removed, the list
+        returned is a copy which callers may change.
+        """
+        topics = self._subTopics
+        if topics is None:
+            topics = self._subTopics = tuple(
+                item for item in self.values()
+                if IOnlineHelpTopic.providedBy(item))
+        return list(topics)
 
 
-class BaseOnlineHelpTopic(SampleContainer):
+class BaseOnlineHelpTopic(_TopicBase, SampleContainer):
     """Base class for custom Help Topic implementations.
 
       >>> from zope.app.onlinehelp.tests.test_onlinehelp import testdir
@@ -137,6 +315,17 @@ class BaseOnlineHelpTopic(SampleContainer):
       'image/png'
       >>> topic['test2.png'].contentType
       'image/png'
+
+    Resources are not sub topics:
+
+      >>> topic.getSubTopics()
+      []
+      >>> topic['sub'] = OnlineHelpTopic('sub', 'Sub', path, 'help')
+      >>> [sub.id for sub in topic.getSubTopics()]
+      ['sub']
+      >>> del topic['sub']
+      >>> topic.getSubTopics()
+      []
     """
 
     id = ""
@@ -146,60 +335,59 @@ class BaseOnlineHelpTopic(SampleContainer):
     interface = None
     view = None
 
-    def __init__(self, id, title, path, parentPath, interface=None, view=None):
-        """Initialize object."""
-        self.id = id
-        self.parentPath = parentPath
-        self.title = title
-        self.path = path
-        self.interface = interface
-        self.view = view
+    # The cached result of `getSubTopics`
+    _subTopics = None
 
-        if not os.path.exists(self.path):
-            raise ConfigurationError(
-                "Help Topic definition %s does not exist" % self.path
-            )
+    def __setitem__(self, key, object):
+        super().__setitem__(key, object)
+        self._subTopics = None
+        _hierarchyChanged()
 
-        super().__init__()
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._subTopics = None
+        _hierarchyChanged()
 
     def _newContainerData(self):
         # Ensure consistent iteration order for tests.
         from collections import OrderedDict
         return OrderedDict()
 
-    def addResources(self, resources):
-        """ see IOnlineHelpTopic """
-        dirname = os.path.dirname(self.path)
-        for resource in resources:
-            resource_path = dirname + '/' + resource
-            if os.path.exists(resource_path):
-                self[resource] = OnlineHelpResource(resource_path)
 
-    def getTopicPath(self):
-        """See IOnlineHelpTopic"""
-        if self.parentPath:
-            return self.parentPath + '/' + self.id
-        return self.id
+class _SourceTextBase:
+    """Source text methods independent of the storage."""
 
-    def getSubTopics(self):
-        res = []
-        for item in self.values():
-            if IOnlineHelpTopic.providedBy(item):
-                res.append(item)
+    __slots__ = ()
 
-        return res
+    @property
+    def source(self):
+        path = os.path.normpath(self.path)
+        return sourceCache.lookup(('source', path), path, self._readSource)
+
+    def _readSource(self):
+        with open(os.path.normpath(self.path), 'rb') as f:
+            source = f.read()
+        return source.decode(DEFAULT_ENCODING)
 
 
-class SourceTextOnlineHelpTopic(BaseOnlineHelpTopic):
+class SourceTextOnlineHelpTopic(_SourceTextBase, BaseOnlineHelpTopic):
     """Source text methods mixin class."""
 
     type = None
 
-    @property
-    def source(self):
-        with open(os.path.normpath(self.path), 'rb') as f:
-            source = f.read()
-        return source.decode(DEFAULT_ENCODING)
+
+def _sourceType(path):
+    """Guess the source type of a topic file from its extension."""
+    filename = os.path.basename(path.lower())
+    file_ext = 'txt'
+    if len(filename.split('.')) > 1:
+        file_ext = filename.split('.')[-1]
+
+    if file_ext in ('rst', 'rest'):
+        return 'zope.source.rest'
+    elif file_ext in ('stx', 'html', 'htm'):
+        return 'zope.source.stx'
+    return 'zope.source.plaintext'
 
 
 @implementer(ISourceTextOnlineHelpTopic)
@@ -283,18 +471,7 @@ class OnlineHelpTopic(SourceTextOnlineHelpTopic):
     def __init__(self, id, title, path, parentPath, interface=None, view=None):
         """Initialize object."""
         super().__init__(id, title, path, parentPath, interface, view)
-
-        filename = os.path.basename(path.lower())
-        file_ext = 'txt'
-        if len(filename.split('.')) > 1:
-            file_ext = filename.split('.')[-1]
-
-        self.type = 'zope.source.plaintext'
-
-        if file_ext in ('rst', 'rest'):
-            self.type = 'zope.source.rest'
-        elif file_ext in ('stx', 'html', 'htm'):
-            self.type = 'zope.source.stx'
+        self.type = _sourceType(path)
 
 
 @implementer(IRESTOnlineHelpTopic)
@@ -454,3 +631,152 @@ class ZPTOnlineHelpTopic(BaseOnlineHelpTopic):
       >>> topic['test2.png'].contentType
       'image/png'
     """
+
+
+# The children of compact topics without children
+_NO_CHILDREN = MappingProxyType({})
+
+
+@implementer(IOnlineHelpResource, IContained)
+class CompactOnlineHelpResource(_ResourceBase):
+    """A resource of a compact help topic.
+
+    Unlike `OnlineHelpResource` it is not persistent and stores its
+    attributes in slots. It is contained in its topic without a proxy.
+
+      >>> from zope.app.onlinehelp.tests.test_onlinehelp import testdir
+      >>> path = os.path.join(testdir(), 'test1.png')
+      >>> resource = CompactOnlineHelpResource(path)
+      >>> resource.contentType
+      'image/png'
+      >>> resource.getSize() == os.path.getsize(path)
+      True
+    """
+
+    __slots__ = ('path', 'contentType', '_size', '_fileMode', '_encoding',
+                 '__parent__', '__name__')
+
+    def __init__(self, path='', contentType=''):
+        self.__parent__ = self.__name__ = None
+        super().__init__(path, contentType)
+
+
+@implementer(IContained)
+class CompactBaseOnlineHelpTopic(_TopicBase):
+    """Base class for compact Help Topic implementations.
+
+    Compact topics are meant for the global help tree, which is neither
+    persistent nor shared between processes. They store their attributes in
+    slots and share one empty mapping of children until a child is added.
+
+      >>> from zope.app.onlinehelp.tests.test_onlinehelp import testdir
+      >>> path = os.path.join(testdir(), 'help.txt')
+      >>> topic = CompactBaseOnlineHelpTopic('help', 'Help', path, '')
+      >>> topic.getTopicPath()
+      'help'
+      >>> len(topic)
+      0
+
+      >>> topic.addResources(['test1.png', 'test2.png'])
+      >>> list(topic.keys())
+      ['test1.png', 'test2.png']
+      >>> topic['test1.png'].__parent__ is topic
+      True
+      >>> del topic['test2.png']
+      >>> 'test2.png' in topic
+      False
+    """
+
+    __slots__ = ('id', 'title', 'path', 'parentPath', 'interface', 'view',
+                 '_children', '_subTopics', '__parent__', '__name__')
+
+    resourceClass = CompactOnlineHelpResource
+
+    def __init__(self, id, title, path, parentPath, interface=None, view=None):
+        self.__parent__ = self.__name__ = None
+        self._children = _NO_CHILDREN
+        super().__init__(id, title, path, parentPath, interface, view)
+
+    def keys(self):
+        return self._children.keys()
+
+    def __iter__(self):
+        return iter(self._children)
+
+    def __getitem__(self, key):
+        return self._children[key]
+
+    def get(self, key, default=None):
+        return self._children.get(key, default)
+
+    def values(self):
+        return self._children.values()
+
+    def __len__(self):
+        return len(self._children)
+
+    def items(self):
+        return self._children.items()
+
+    def __contains__(self, key):
+        return key in self._children
+
+    has_key = __contains__
+
+    def __setitem__(self, key, object):
+        if self._children is _NO_CHILDREN:
+            self._children = {}
+        setitem(self, self._children.__setitem__, key, object)
+        self._subTopics = None
+        _hierarchyChanged()
+
+    def __delitem__(self, key):
+        uncontained(self._children[key], self, key)
+        del self._children[key]
+        self._subTopics = None
+        _hierarchyChanged()
+
+
+@implementer(ISourceTextOnlineHelpTopic)
+class CompactOnlineHelpTopic(_SourceTextBase, CompactBaseOnlineHelpTopic):
+    """Compact variant of `OnlineHelpTopic`.
+
+      >>> from zope.app.onlinehelp.tests.test_onlinehelp import testdir
+      >>> path = os.path.join(testdir(), 'help.rst')
+      >>> topic = CompactOnlineHelpTopic('help', 'Help', path, '')
+      >>> topic.type
+      'zope.source.rest'
+      >>> hasattr(topic, '__dict__')
+      False
+    """
+
+    __slots__ = ('type',)
+
+    def __init__(self, id, title, path, parentPath, interface=None, view=None):
+        super().__init__(id, title, path, parentPath, interface, view)
+        self.type = _sourceType(path)
+
+
+@implementer(IRESTOnlineHelpTopic)
+class CompactRESTOnlineHelpTopic(_SourceTextBase, CompactBaseOnlineHelpTopic):
+    """Compact variant of `RESTOnlineHelpTopic`."""
+
+    __slots__ = ()
+
+    type = 'zope.source.rest'
+
+
+@implementer(ISTXOnlineHelpTopic)
+class CompactSTXOnlineHelpTopic(_SourceTextBase, CompactBaseOnlineHelpTopic):
+    """Compact variant of `STXOnlineHelpTopic`."""
+
+    __slots__ = ()
+
+    type = 'zope.source.stx'
+
+
+@implementer(IZPTOnlineHelpTopic)
+class CompactZPTOnlineHelpTopic(CompactBaseOnlineHelpTopic):
+    """Compact variant of `ZPTOnlineHelpTopic`."""
+
+    __slots__ = ()
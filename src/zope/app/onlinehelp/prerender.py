@@ -0,0 +1,197 @@
+##############################################################################
+#
+# Copyright (c) 2026 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""Pre-rendering of the OnlineHelp.
+
+The ``zope-onlinehelp-prerender`` script loads a ZCML configuration and
+renders the source of every registered source text topic into a directory,
+together with the resources of the topics::
+
+  zope-onlinehelp-prerender site.zcml var/help
+
+A server configured with the ``help:prerendered`` directive then serves the
+pre-rendered HTML of a topic as long as the topic file did not change.
+
+"""
+__docformat__ = 'restructuredtext'
+
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+from zope.component import createObject
+from zope.component import getMultiAdapter
+from zope.component import getUtilitiesFor
+from zope.configuration import xmlconfig
+from zope.publisher.browser import TestRequest
+from zope.testing import cleanup
+
+from zope.app.onlinehelp.cache import fileSignature
+from zope.app.onlinehelp.interfaces import IBundleOnlineHelpTopic
+from zope.app.onlinehelp.interfaces import IOnlineHelpResource
+from zope.app.onlinehelp.interfaces import IOnlineHelpTopic
+from zope.app.onlinehelp.interfaces import ISourceTextOnlineHelpTopic
+from zope.app.onlinehelp.onlinehelptopic import DEFAULT_ENCODING
+
+
+MANIFEST = 'manifest.json'
+
+# The manifest of the directory configured with `help:prerendered`.
+_prerendered = {}
+_directory = None
+
+
+def renderSource(type, path):
+    """Render the source text file at `path` with the renderer for `type`.
+    """
+    with open(os.path.normpath(path), 'rb') as f:
+        source = f.read().decode(DEFAULT_ENCODING)
+    return renderText(type, source)
+
+
+def renderText(type, source):
+    """Render the `source` text with the renderer for `type`."""
+    source = createObject(type, source)
+    return getMultiAdapter((source, TestRequest())).render()
+
+
+def _renderTask(task):
+    topic_path, type, path = task
+    return topic_path, renderSource(type, path)
+
+
+def _initWorker(zcml):
+    xmlconfig.file(os.path.abspath(zcml))
+
+
+def getTopics():
+    """Return the registered topics by their topic path.
+
+    The root topic of `globalhelp` has the path ``''``.
+    """
+    from zope.app.onlinehelp import globalhelp
+    from zope.app.onlinehelp import materialize
+    materialize()
+    topics = {globalhelp.getTopicPath(): globalhelp}
+    for _name, topic in getUtilitiesFor(IOnlineHelpTopic):
+        topics[topic.getTopicPath()] = topic
+    return topics
+
+
+def prerender(directory, processes=1, zcml=None):
+    """Render all registered source text topics into `directory`.
+
+    The HTML of a topic is written to ``index.html`` in the directory of
+    its topic path and the resources of the topic are copied next to it.
+    With more than one process the topics are rendered by a process pool;
+    if the processes are not forked, they load `zcml` first.
+
+    Returns the manifest, which is also written to the directory.
+    """
+    manifest = {}
+    tasks = []
+    for topic_path, topic in sorted(getTopics().items()):
+        if not ISourceTextOnlineHelpTopic.providedBy(topic):
+            # page template topics depend on the request
+            continue
+        if IBundleOnlineHelpTopic.providedBy(topic):
+            # already pre-rendered
+            continue
+        target = os.path.join(directory, *topic_path.split('/'))
+        os.makedirs(target, exist_ok=True)
+        for name, resource in topic.items():
+            if IOnlineHelpResource.providedBy(resource):
+                shutil.copyfile(resource.path, os.path.join(target, name))
+        manifest[topic_path] = {
+            'path': topic.path,
+            'type': topic.type,
+            'signature': list(fileSignature(topic.path)),
+        }
+        tasks.append((topic_path, topic.type, topic.path))
+
+    if processes > 1:
+        if 'fork' in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context('fork')
+            initializer, initargs = None, ()
+        else:  # pragma: no cover
+            context = multiprocessing.get_context()
+            initializer, initargs = _initWorker, (zcml,)
+        with ProcessPoolExecutor(processes, mp_context=context,
+                                 initializer=initializer,
+                                 initargs=initargs) as pool:
+            results = list(pool.map(_renderTask, tasks, chunksize=16))
+    else:
+        results = map(_renderTask, tasks)
+
+    for topic_path, html in results:
+        target = os.path.join(directory, *topic_path.split('/'))
+        with open(os.path.join(target, 'index.html'), 'wb') as f:
+            f.write(html.encode('utf-8'))
+
+    with open(os.path.join(directory, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    return manifest
+
+
+def loadPrerendered(directory):
+    """Serve the topics pre-rendered into `directory`."""
+    global _directory
+    with open(os.path.join(directory, MANIFEST)) as f:
+        manifest = json.load(f)
+    _prerendered.clear()
+    _prerendered.update(manifest)
+    _directory = directory
+
+
+def queryPrerendered(topic):
+    """Return the pre-rendered HTML of `topic` or None.
+
+    None is returned if the topic was not pre-rendered or if its file
+    changed since.
+    """
+    entry = _prerendered.get(topic.getTopicPath())
+    if (entry is None
+            or entry['path'] != topic.path
+            or entry['type'] != topic.type
+            or tuple(entry['signature']) != fileSignature(topic.path)):
+        return None
+    path = os.path.join(_directory, *topic.getTopicPath().split('/'))
+    with open(os.path.join(path, 'index.html'), 'rb') as f:
+        return f.read().decode('utf-8')
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description='Pre-render the registered help topics.')
+    parser.add_argument('zcml', help='the ZCML file configuring the site')
+    parser.add_argument('directory', help='the output directory')
+    parser.add_argument('-j', '--processes', type=int,
+                        default=os.cpu_count() or 1,
+                        help='number of rendering processes')
+    options = parser.parse_args(args)
+
+    xmlconfig.file(os.path.abspath(options.zcml))
+    manifest = prerender(options.directory, options.processes, options.zcml)
+    print('Rendered %d topics into %s' % (len(manifest), options.directory))
+
+
+def _clear():
+    global _directory
+    _prerendered.clear()
+    _directory = None
+
+
+cleanup.addCleanUp(_clear)
@@ -0,0 +1,246 @@
+##############################################################################
+#
+# Copyright (c) 2026 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""Full-text search of the OnlineHelp.
+
+Topics registered with `OnlineHelp.registerHelpTopic` are added to
+`searchIndex`. Their files are only read and indexed when the index is
+searched for the first time after the registration, so the registration
+itself stays cheap. That search indexes all pending topics while holding the
+lock of the index, so concurrent searches wait for it; with ``help:store``
+the terms of unchanged topics are read from the store instead of the files.
+
+"""
+__docformat__ = 'restructuredtext'
+
+import heapq
+import logging
+import math
+import re
+import threading
+from collections import Counter
+from collections import OrderedDict
+
+from zope.testing import cleanup
+
+from zope.app.onlinehelp.interfaces import IZPTOnlineHelpTopic
+
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r'\w+')
+_TAG = re.compile(r'<[^>]*>')
+
+
+def tokenize(text):
+    """Split `text` into lower case words.
+
+      >>> tokenize('The OnlineHelp_System, version 3.1!')
+      ['the', 'onlinehelp_system', 'version', '3', '1']
+    """
+    return _WORD.findall(text.lower())
+
+
+def termCounts(text):
+    """Return how often each word occurs in `text`.
+
+      >>> sorted(termCounts('Views, views and forms').items())
+      [('and', 1), ('forms', 1), ('views', 2)]
+    """
+    return dict(Counter(tokenize(text)))
+
+
+def topicText(topic):
+    """Return the text of `topic` to index.
+
+    Markup is removed from HTML and page template topics.
+
+      >>> class Topic:
+      ...     type = 'zope.source.html'
+      ...     source = '<p>Some <em>HTML</em></p>'
+      >>> tokenize(topicText(Topic()))
+      ['some', 'html']
+    """
+    if IZPTOnlineHelpTopic.providedBy(topic):
+        with open(topic.path, 'rb') as f:
+            return _TAG.sub(' ', f.read().decode('utf-8', 'replace'))
+    text = topic.source
+    if 'html' in getattr(topic, 'type', '').lower():
+        text = _TAG.sub(' ', text)
+    return text
+
+
+class SearchIndex:
+    """An inverted index of help topics ranked with BM25.
+
+      >>> class Topic:
+      ...     def __init__(self, path, title, source):
+      ...         self.path = self._path = path
+      ...         self.title = title
+      ...         self.source = source
+      ...     def getTopicPath(self):
+      ...         return self._path
+
+      >>> index = SearchIndex()
+      >>> index.add(Topic('a', 'Views', 'How to write views and forms.'))
+      >>> index.add(Topic('b', 'Forms', 'Forms are views, too.'))
+      >>> index.add(Topic('c', 'Security', 'Permissions protect views.'))
+
+    Topics match if they contain all words of the query. Words in the title
+    weigh more than words in the text:
+
+      >>> [topic.getTopicPath() for topic in index.search('forms')]
+      ['b', 'a']
+      >>> [topic.getTopicPath() for topic in index.search('views forms')]
+      ['b', 'a']
+      >>> index.search('views spam')
+      []
+      >>> index.search('')
+      []
+
+    Topics added with a path already in the index replace the old one:
+
+      >>> index.add(Topic('b', 'Forms', 'Forms are great.'))
+      >>> [topic.getTopicPath() for topic in index.search('views')]
+      ['a', 'c']
+      >>> len(index)
+      3
+    """
+
+    # How often the words of the title are counted
+    titleWeight = 3
+
+    # BM25 parameters
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self._pending = OrderedDict()
+        self._topics = {}
+        self._lengths = {}
+        self._terms = {}
+        self._postings = {}
+        self._totalLength = 0
+
+    def __len__(self):
+        with self._lock:
+            self._update()
+            return len(self._topics)
+
+    def add(self, topic):
+        """Add `topic` to the index when it is searched next."""
+        with self._lock:
+            path = topic.getTopicPath()
+            self._pending.pop(path, None)
+            self._pending[path] = topic
+
+    def update(self):
+        """Index the topics added since the last search."""
+        with self._lock:
+            self._update()
+
+    def _update(self):
+        # imported here, the store depends on this module
+        from zope.app.onlinehelp.store import getStore
+        store = getStore()
+        while self._pending:
+            path, topic = self._pending.popitem(last=False)
+            terms = None
+            if store is not None and hasattr(topic, 'path'):
+                terms = store.queryTerms(topic)
+            if terms is None:
+                try:
+                    terms = termCounts(topicText(topic))
+                except Exception:
+                    # a broken topic must not break the search
+                    logger.exception('Cannot index the help topic %s', path)
+                    terms = {}
+            self._index(path, topic, terms)
+
+    def _index(self, path, topic, terms):
+        self._remove(path)
+        title = tokenize(topic.title)
+        counts = Counter(terms)
+        for word in title:
+            counts[word] += self.titleWeight
+        length = sum(terms.values()) + self.titleWeight * len(title)
+        for term, count in counts.items():
+            self._postings.setdefault(term, {})[path] = count
+        self._topics[path] = topic
+        self._terms[path] = tuple(counts)
+        self._lengths[path] = length
+        self._totalLength += length
+
+    def _remove(self, path):
+        if path not in self._topics:
+            return
+        for term in self._terms.pop(path):
+            postings = self._postings[term]
+            del postings[path]
+            if not postings:
+                del self._postings[term]
+        self._totalLength -= self._lengths.pop(path)
+        del self._topics[path]
+
+    def search(self, query, limit=20):
+        """Return the `limit` best topics matching all words of `query`."""
+        with self._lock:
+            self._update()
+            terms = set(tokenize(query))
+            if not terms or not self._topics:
+                return []
+            postings = []
+            for term in terms:
+                found = self._postings.get(term)
+                if not found:
+                    return []
+                postings.append(found)
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for found in postings[1:]:
+                candidates.intersection_update(found)
+                if not candidates:
+                    return []
+
+            count = len(self._topics)
+            average = self._totalLength / count or 1
+            weights = [
+                (found, math.log(1 + (count - len(found) + 0.5)
+                                 / (len(found) + 0.5)))
+                for found in postings]
+            k1, b = self.k1, self.b
+            scores = []
+            for path in candidates:
+                norm = k1 * (1 - b + b * self._lengths[path] / average)
+                score = 0.0
+                for found, idf in weights:
+                    tf = found[path]
+                    score += idf * tf * (k1 + 1) / (tf + norm)
+                scores.append((-score, path))
+            best = heapq.nsmallest(limit, scores)
+            return [self._topics[path] for _score, path in best]
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+
+
+# The index of the topics registered with `OnlineHelp.registerHelpTopic`.
+searchIndex = SearchIndex()
+
+
+cleanup.addCleanUp(searchIndex.clear)
@@ -0,0 +1,265 @@
+##############################################################################
+#
+# Copyright (c) 2026 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""On-disk store of data derived from the help topics.
+
+The ``zope-onlinehelp-store`` script loads a ZCML configuration and writes
+the rendered HTML and the search terms of all topics `globalhelp` holds into
+one file::
+
+  zope-onlinehelp-store site.zcml var/help.store
+
+The entries are keyed by the SHA-1 hash of the topic files. When the store
+is built again, only the entries of files that changed are computed; the
+others are copied from the existing store.
+
+A server configured with the ``help:store`` directive memory-maps the file,
+so that all its worker processes share one copy through the page cache, and
+uses its entries instead of rendering and indexing the topics itself.
+
+The file starts with `MAGIC` and the length of a JSON index as 8 byte
+big-endian integer, followed by the index and the entries. The index maps
+the paths of the topic files to their signature and hash and the keys of the
+entries to their offset and length.
+
+"""
+__docformat__ = 'restructuredtext'
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+
+from zope.configuration import xmlconfig
+from zope.testing import cleanup
+
+from zope.app.onlinehelp.cache import fileSignature
+from zope.app.onlinehelp.interfaces import IBundleOnlineHelpTopic
+from zope.app.onlinehelp.interfaces import IOnlineHelpTopic
+from zope.app.onlinehelp.interfaces import ISourceTextOnlineHelpTopic
+from zope.app.onlinehelp.interfaces import IZPTOnlineHelpTopic
+from zope.app.onlinehelp.prerender import renderSource
+from zope.app.onlinehelp.search import termCounts
+from zope.app.onlinehelp.search import topicText
+
+
+MAGIC = b'ZOHSTORE1\n'
+
+_LENGTH = struct.Struct('>Q')
+
+# The store configured with `help:store`.
+_store = None
+
+
+def fileHash(path):
+    """Return the SHA-1 hash of the content of the file at `path`."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _htmlKey(type, digest):
+    return 'html:%s:%s' % (type, digest)
+
+
+def _termsKey(digest):
+    return 'terms:' + digest
+
+
+class HelpStore:
+    """A memory-mapped store file."""
+
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < len(MAGIC) + _LENGTH.size:
+                raise ValueError('%s is not a help store' % filename)
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError('%s is not a help store' % filename)
+        start = len(MAGIC) + _LENGTH.size
+        length, = _LENGTH.unpack(self._map[len(MAGIC):start])
+        index = json.loads(self._map[start:start + length].decode('utf-8'))
+        self._offset = start + length
+        self.files = index['files']
+        self.entries = index['entries']
+
+    def close(self):
+        self._map.close()
+
+    def get(self, key):
+        """Return the entry stored under `key` as bytes or None."""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        offset, length = entry
+        offset += self._offset
+        return self._map[offset:offset + length]
+
+    def queryHash(self, path):
+        """Return the hash of the file at `path` if it did not change."""
+        entry = self.files.get(path)
+        if entry is None:
+            return None
+        mtime_ns, size, digest = entry
+        try:
+            if fileSignature(path) != (mtime_ns, size):
+                return None
+        except OSError:
+            return None
+        return digest
+
+    def queryHTML(self, topic):
+        """Return the stored HTML of `topic` or None."""
+        digest = self.queryHash(topic.path)
+        if digest is None:
+            return None
+        html = self.get(_htmlKey(topic.type, digest))
+        return html.decode('utf-8') if html is not None else None
+
+    def queryTerms(self, topic):
+        """Return the stored search terms of `topic` or None.
+
+        The terms are a dictionary mapping the words of the topic text to
+        their number of occurrences.
+        """
+        digest = self.queryHash(topic.path)
+        if digest is None:
+            return None
+        terms = self.get(_termsKey(digest))
+        return json.loads(terms.decode('utf-8')) if terms is not None else None
+
+
+def walkTopics(root):
+    """Iterate over all topics below `root`."""
+    for topic in root.values():
+        if IOnlineHelpTopic.providedBy(topic):
+            yield topic
+            yield from walkTopics(topic)
+
+
+def buildStore(filename, root=None):
+    """Write the store of the topics below `root` to `filename`.
+
+    `root` defaults to `globalhelp`. Entries of files which did not change
+    are copied from an existing store at `filename`.
+
+    Returns the number of computed and of copied entries.
+    """
+    if root is None:
+        from zope.app.onlinehelp import globalhelp as root
+        from zope.app.onlinehelp import materialize
+        materialize()
+    try:
+        old = HelpStore(filename)
+    except (OSError, ValueError):
+        old = None
+
+    files = {}
+    blobs = {}
+    built = copied = 0
+
+    def add(key, compute):
+        nonlocal built, copied
+        if key in blobs:
+            return
+        data = old.get(key) if old is not None else None
+        if data is None:
+            data = compute()
+            built += 1
+        else:
+            copied += 1
+        blobs[key] = data
+
+    for topic in walkTopics(root):
+        if IBundleOnlineHelpTopic.providedBy(topic):
+            # stored in the file of their bundle
+            continue
+        path = topic.path
+        if path not in files:
+            digest = old.queryHash(path) if old is not None else None
+            if digest is None:
+                digest = fileHash(path)
+            files[path] = list(fileSignature(path)) + [digest]
+        digest = files[path][2]
+        if ISourceTextOnlineHelpTopic.providedBy(topic):
+            add(_htmlKey(topic.type, digest),
+                lambda: renderSource(topic.type, path).encode('utf-8'))
+        if (ISourceTextOnlineHelpTopic.providedBy(topic)
+                or IZPTOnlineHelpTopic.providedBy(topic)):
+            add(_termsKey(digest),
+                lambda: json.dumps(termCounts(topicText(topic)),
+                                   sort_keys=True).encode('utf-8'))
+
+    entries = {}
+    offset = 0
+    for key, data in blobs.items():
+        entries[key] = (offset, len(data))
+        offset += len(data)
+    index = json.dumps({'files': files, 'entries': entries},
+                       sort_keys=True).encode('utf-8')
+
+    if old is not None:
+        old.close()
+    tmp = filename + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(MAGIC)
+        f.write(_LENGTH.pack(len(index)))
+        f.write(index)
+        for data in blobs.values():
+            f.write(data)
+    # Processes using the old store keep their mapping of the old file
+    os.replace(tmp, filename)
+    return built, copied
+
+
+def loadStore(filename):
+    """Use the store in `filename`."""
+    global _store
+    store = HelpStore(filename)
+    if _store is not None:
+        _store.close()
+    _store = store
+
+
+def getStore():
+    """Return the store configured with `help:store` or None."""
+    return _store
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description='Build the store of the registered help topics.')
+    parser.add_argument('zcml', help='the ZCML file configuring the site')
+    parser.add_argument('filename', help='the store file')
+    options = parser.parse_args(args)
+
+    xmlconfig.file(os.path.abspath(options.zcml))
+    built, copied = buildStore(options.filename)
+    print('Computed %d and kept %d entries in %s'
+          % (built, copied, options.filename))
+
+
+def _clear():
+    global _store
+    if _store is not None:
+        _store.close()
+    _store = None
+
+
+cleanup.addCleanUp(_clear)
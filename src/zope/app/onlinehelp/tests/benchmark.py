@@ -0,0 +1,397 @@
+##############################################################################
+#
+# Copyright (c) 2026 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""Benchmarks for the OnlineHelp System.
+
+Run them with::
+
+  python -m zope.app.onlinehelp.tests.benchmark --topics 10000 --json out.json
+
+The benchmarks run against a synthetic help tree with the given number of
+topics, each with up to ``--fanout`` children. Every benchmark is repeated
+``--repeat`` times and the fastest run is reported, as text and optionally
+as JSON which can be compared between runs with ``--compare``.
+
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import zope.app.renderer
+import zope.traversing
+from zope.component import provideUtility
+from zope.component import testing
+from zope.configuration import xmlconfig
+from zope.interface import Interface
+from zope.interface import directlyProvides
+from zope.interface.interface import InterfaceClass
+from zope.publisher.browser import TestRequest
+
+from zope.app.onlinehelp import getTopicFor
+from zope.app.onlinehelp.browser import OnlineHelpTopicView
+from zope.app.onlinehelp.browser import ZPTOnlineHelpTopicView
+from zope.app.onlinehelp.browser.resource import FileResult
+from zope.app.onlinehelp.browser.tree import OnlineHelpTopicTreeView
+from zope.app.onlinehelp.cache import _clear as clearCaches
+from zope.app.onlinehelp.directory import _clear as clearScans
+from zope.app.onlinehelp.directory import scanDirectory
+from zope.app.onlinehelp.interfaces import IOnlineHelp
+from zope.app.onlinehelp.onlinehelp import OnlineHelp
+from zope.app.onlinehelp.onlinehelptopic import CompactOnlineHelpTopic
+from zope.app.onlinehelp.onlinehelptopic import OnlineHelpResource
+from zope.app.onlinehelp.onlinehelptopic import OnlineHelpTopic
+from zope.app.onlinehelp.onlinehelptopic import ZPTOnlineHelpTopic
+
+
+# The topic files rendered by the topicContent benchmarks by source type
+SOURCES = {
+    'zope.source.plaintext': 'help.txt',
+    'zope.source.stx': 'help.stx',
+    'zope.source.rest': 'help.rst',
+    'zpt': 'help.pt',
+}
+
+
+def testdir():
+    return os.path.dirname(__file__)
+
+
+def synthetic_topics(count, fanout=10):
+    """Yield (parent_path, id) pairs of a synthetic topic tree.
+
+    The tree has `count` topics, each with up to `fanout` children. The
+    topics are yielded in reversed order so that every child is registered
+    before its parent.
+    """
+    paths = ['']
+    for n in range(count):
+        parent = paths[n // fanout]
+        id = 'topic%d' % n
+        paths.append(parent + '/' + id if parent else id)
+    for path in reversed(paths[1:]):
+        parent, _, id = path.rpartition('/')
+        yield parent, id
+
+
+def _setUp():
+    testing.setUp()
+    xmlconfig.file('configure.zcml', zope.traversing)
+    xmlconfig.file('configure.zcml', zope.app.renderer)
+
+
+def _best(func, repeat, number=1):
+    """Return the fastest of `repeat` runs of `number` calls to `func`."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+def _result(seconds, ops, **extra):
+    result = {'seconds': seconds, 'ops': ops,
+              'us_per_op': seconds / ops * 1e6}
+    result.update(extra)
+    return result
+
+
+def _buildHelp(count, fanout, interfaces=()):
+    """Register a synthetic tree and return its root.
+
+    The topics are bound to `interfaces` in turn.
+    """
+    path = os.path.join(testdir(), 'help.txt')
+    onlinehelp = OnlineHelp('Help', path)
+    for n, (parent_path, id) in enumerate(synthetic_topics(count, fanout)):
+        interface = interfaces[n % len(interfaces)] if interfaces else None
+        onlinehelp.registerHelpTopic(parent_path, id, id, path, interface)
+    return onlinehelp
+
+
+def bench_registration(count, fanout=10, batch=False):
+    """Return the seconds needed to register `count` topics.
+
+    With `batch` they are registered by one call to `registerHelpTopics`.
+    """
+    _setUp()
+    try:
+        path = os.path.join(testdir(), 'help.txt')
+        onlinehelp = OnlineHelp('Help', path)
+        topics = [(parent_path, id, id, path)
+                  for parent_path, id in synthetic_topics(count, fanout)]
+        start = time.perf_counter()
+        if batch:
+            onlinehelp.registerHelpTopics(topics)
+        else:
+            for args in topics:
+                onlinehelp.registerHelpTopic(*args)
+        return time.perf_counter() - start
+    finally:
+        testing.tearDown()
+
+
+def bench_directory(count, fanout=10, repeat=3):
+    """Time scanning and registering a directory tree of `count` files."""
+    directory = tempfile.mkdtemp()
+    _setUp()
+    try:
+        with open(os.path.join(testdir(), 'help.txt'), 'rb') as f:
+            data = f.read()
+        for parent_path, id in synthetic_topics(count, fanout):
+            path = os.path.join(directory, parent_path, id + '.txt')
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(data)
+
+        def cold():
+            clearScans()
+            scanDirectory(directory)
+
+        def register():
+            testing.tearDown()
+            _setUp()
+            onlinehelp = OnlineHelp('Help', os.path.join(testdir(),
+                                                         'help.txt'))
+            start = time.perf_counter()
+            onlinehelp.registerHelpTopics(scanDirectory(directory))
+            return time.perf_counter() - start
+
+        cold()
+        return {
+            'scanDirectory.cold': _result(_best(cold, repeat), count),
+            'scanDirectory.warm': _result(
+                _best(lambda: scanDirectory(directory), repeat), count),
+            'registerDirectory': _result(
+                min(register() for _ in range(repeat)), count),
+        }
+    finally:
+        testing.tearDown()
+        shutil.rmtree(directory)
+
+
+def bench_memory(count, class_=OnlineHelpTopic, fanout=10):
+    """Return the bytes allocated for a tree of `count` topics.
+
+    Every topic has one resource.
+    """
+    path = os.path.join(testdir(), 'help.txt')
+    topics = list(synthetic_topics(count, fanout))
+    tracemalloc.start()
+    try:
+        root = class_('', 'Help', path, '')
+        nodes = {'': root}
+        for parent_path, id in reversed(topics):
+            topic = class_(id, id, path, parent_path)
+            topic.addResources(['test1.png'])
+            nodes[parent_path][id] = topic
+            nodes[topic.getTopicPath()] = topic
+        size, _peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return size
+
+
+def bench_getTopicFor(count, fanout=10, repeat=3, number=10000):
+    """Time `getTopicFor` for objects with and without a topic."""
+    _setUp()
+    try:
+        interfaces = [InterfaceClass('I%d' % n, (Interface,))
+                      for n in range(100)]
+        _buildHelp(count, fanout, interfaces)
+
+        class Content:
+            pass
+
+        found = Content()
+        directlyProvides(found, *interfaces[50:60])
+        missing = Content()
+        directlyProvides(missing, InterfaceClass('IMissing', (Interface,)))
+        return {
+            'getTopicFor.found': _result(_best(
+                lambda: getTopicFor(found), repeat, number), number),
+            'getTopicFor.missing': _result(_best(
+                lambda: getTopicFor(missing), repeat, number), number),
+        }
+    finally:
+        testing.tearDown()
+
+
+def bench_getTopicTree(count, fanout=10, repeat=3, number=100):
+    """Time rendering the navigation tree, with and without cache."""
+    _setUp()
+    try:
+        onlinehelp = _buildHelp(count, fanout)
+        provideUtility(onlinehelp, IOnlineHelp, 'OnlineHelp')
+        # the deepest topic is the context of the request
+        context = onlinehelp
+        while context.getSubTopics():
+            context = context.getSubTopics()[-1]
+
+        def render():
+            OnlineHelpTopicTreeView(context, TestRequest()).getTopicTree()
+
+        def cold():
+            clearCaches()
+            render()
+
+        render()
+        return {
+            'getTopicTree.cold': _result(_best(cold, repeat), 1),
+            'getTopicTree.warm': _result(
+                _best(render, repeat, number), number),
+        }
+    finally:
+        testing.tearDown()
+
+
+def bench_topicContent(repeat=3, number=100):
+    """Time rendering the topics of each source type."""
+    _setUp()
+    try:
+        results = {}
+        for type, filename in sorted(SOURCES.items()):
+            path = os.path.join(testdir(), filename)
+            if type == 'zpt':
+                topic = ZPTOnlineHelpTopic('topic', 'Topic', path, '')
+                render = ZPTOnlineHelpTopicView(
+                    topic, TestRequest()).renderTopic
+            else:
+                topic = OnlineHelpTopic('topic', 'Topic', path, '')
+                render = OnlineHelpTopicView(
+                    topic, TestRequest()).topicContent
+
+            def cold():
+                clearCaches()
+                render()
+
+            results['topicContent.cold.' + type] = _result(
+                _best(cold, repeat, number), number)
+            render()
+            results['topicContent.warm.' + type] = _result(
+                _best(render, repeat, number), number)
+        return results
+    finally:
+        testing.tearDown()
+
+
+def bench_resource(size=16 * 2**20, repeat=3):
+    """Measure the read throughput of a resource of `size` bytes."""
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'resource.bin')
+        with open(path, 'wb') as f:
+            f.write(os.urandom(size))
+        resource = OnlineHelpResource(path)
+
+        def stream():
+            for _chunk in FileResult(path, 0, size):
+                pass
+
+        megabytes = size / 2**20
+        results = {}
+        for name, func in (('resource.data', lambda: resource.data),
+                           ('resource.stream', stream)):
+            seconds = _best(func, repeat)
+            results[name] = _result(seconds, 1,
+                                    mb_per_second=megabytes / seconds)
+        return results
+    finally:
+        shutil.rmtree(directory)
+
+
+def run(counts, fanout=10, repeat=3):
+    """Run all benchmarks and return the results."""
+    results = {}
+    for count in counts:
+        seconds = bench_registration(count, fanout)
+        results['registerHelpTopic.%d' % count] = _result(seconds, count)
+        seconds = bench_registration(count, fanout, batch=True)
+        results['registerHelpTopics.%d' % count] = _result(seconds, count)
+        for name, result in bench_directory(count, fanout, repeat).items():
+            results['%s.%d' % (name, count)] = result
+        for class_ in (OnlineHelpTopic, CompactOnlineHelpTopic):
+            size = bench_memory(count, class_, fanout)
+            results['memory.%s.%d' % (class_.__name__, count)] = {
+                'bytes': size, 'bytes_per_topic': size // count}
+        for name, result in bench_getTopicFor(count, fanout, repeat).items():
+            results['%s.%d' % (name, count)] = result
+        for name, result in bench_getTopicTree(
+                count, fanout, repeat).items():
+            results['%s.%d' % (name, count)] = result
+    results.update(bench_topicContent(repeat))
+    results.update(bench_resource(repeat=repeat))
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': {'topics': counts, 'fanout': fanout,
+                       'repeat': repeat},
+        'results': results,
+    }
+
+
+def _value(result):
+    if 'seconds' in result:
+        return result['us_per_op'], 'us/op'
+    return result['bytes_per_topic'], 'bytes/topic'
+
+
+def report(data, baseline=None, out=sys.stdout):
+    """Print the results, compared to a `baseline` if given."""
+    for name, result in sorted(data['results'].items()):
+        value, unit = _value(result)
+        line = '%-48s %12.2f %s' % (name, value, unit)
+        old = (baseline or {}).get('results', {}).get(name)
+        if old is not None:
+            old_value = _value(old)[0]
+            if old_value:
+                line += '  (%+.1f%%)' % ((value / old_value - 1) * 100)
+        print(line, file=out)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--topics', type=int, nargs='+',
+                        default=[1000, 10000],
+                        help='numbers of topics of the synthetic trees')
+    parser.add_argument('--fanout', type=int, default=10,
+                        help='maximum number of children of a topic')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='number of runs of which the best is taken')
+    parser.add_argument('--json', metavar='FILE',
+                        help='write the results as JSON to FILE')
+    parser.add_argument('--compare', metavar='FILE',
+                        help='compare with the JSON results in FILE')
+    options = parser.parse_args(args)
+
+    data = run(options.topics, options.fanout, options.repeat)
+    baseline = None
+    if options.compare:
+        with open(options.compare) as f:
+            baseline = json.load(f)
+    report(data, baseline)
+    if options.json:
+        with open(options.json, 'w') as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
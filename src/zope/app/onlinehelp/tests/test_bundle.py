@@ -0,0 +1,156 @@
+##############################################################################
+#
+# Copyright (c) 2026 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""Test the help bundles
+
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+import zope.app.renderer
+import zope.traversing
+from zope.component import testing
+from zope.configuration import xmlconfig
+from zope.i18nmessageid import MessageFactory
+from zope.publisher.browser import TestRequest
+
+import zope.app.onlinehelp
+from zope.app.onlinehelp import bundle
+from zope.app.onlinehelp import globalhelp
+from zope.app.onlinehelp.browser import BundleOnlineHelpTopicView
+from zope.app.onlinehelp.browser.resource import BundleResourceView
+from zope.app.onlinehelp.interfaces import IBundleOnlineHelpTopic
+from zope.app.onlinehelp.onlinehelp import OnlineHelp
+from zope.app.onlinehelp.onlinehelp import lookupTopic
+from zope.app.onlinehelp.onlinehelptopic import RESTOnlineHelpTopic
+from zope.app.onlinehelp.onlinehelptopic import ZPTOnlineHelpTopic
+from zope.app.onlinehelp.prerender import renderSource
+from zope.app.onlinehelp.tests.test_onlinehelp import I1
+from zope.app.onlinehelp.tests.test_onlinehelp import testdir
+
+
+_ = MessageFactory('test')
+
+
+class TestBundle(unittest.TestCase):
+
+    def setUp(self):
+        self._setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.filename = os.path.join(self.directory, 'help.bundle')
+        root = OnlineHelp('Help', testdir())
+        root.registerHelpTopics([
+            ('', 'a', _('Topic A'), self._path('help.txt'), I1, 'view.html',
+             None, ['test1.png']),
+            ('a', 'b', 'Topic B', self._path('help.rst'), None, None,
+             RESTOnlineHelpTopic),
+            ('', 'c', 'Topic C', self._path('help.pt'), None, None,
+             ZPTOnlineHelpTopic),
+            ('c', 'd', 'Topic D', self._path('help.txt')),
+        ])
+        self.skipped = bundle.buildBundle(self.filename, root)
+        # the topics of the bundle replace the ones read from the files
+        testing.tearDown()
+        self._setUp()
+        self.bundle = bundle.HelpBundle(self.filename)
+        self.addCleanup(self.bundle.close)
+        self.root = OnlineHelp('Help', testdir())
+        self.root.registerHelpTopics(bundle.bundleTopics(self.bundle))
+
+    def _setUp(self):
+        testing.setUp()
+        xmlconfig.file('configure.zcml', zope.traversing)
+        xmlconfig.file('configure.zcml', zope.app.renderer)
+
+    def tearDown(self):
+        testing.tearDown()
+
+    def _path(self, name):
+        return os.path.join(testdir(), name)
+
+    def _read(self, name):
+        with open(self._path(name), 'rb') as f:
+            return f.read()
+
+    def test_topics(self):
+        self.assertEqual(['c'], self.skipped)
+        self.assertEqual(['a'], list(self.root.keys()))
+        a = self.root['a']
+        b = a['b']
+        self.assertTrue(IBundleOnlineHelpTopic.providedBy(b))
+        self.assertEqual('Topic A', a.title)
+        self.assertEqual('test', a.title.domain)
+        self.assertEqual('zope.source.rest', b.type)
+        self.assertEqual(self.filename, b.path)
+        self.assertEqual(self._read('help.rst').decode('utf-8'), b.source)
+        self.assertEqual(renderSource(b.type, self._path('help.rst')),
+                         b.html)
+        self.assertIs(a, lookupTopic(I1, 'view.html'))
+
+    def test_resource(self):
+        resource = self.root['a']['test1.png']
+        self.assertEqual('image/png', resource.contentType)
+        self.assertEqual(self._read('test1.png'), resource.data)
+        self.assertEqual(len(resource.data), resource.getSize())
+
+    def test_views(self):
+        topic = self.root['a']['b']
+        view = BundleOnlineHelpTopicView(topic, TestRequest())
+        self.assertEqual(topic.html, view.topicContent())
+
+        data = self._read('test1.png')
+        resource = self.root['a']['test1.png']
+        request = TestRequest(HTTP_RANGE='bytes=1-3')
+        result = BundleResourceView(resource, request).show()
+        self.assertEqual(data[1:4], b''.join(result))
+        self.assertEqual(206, request.response.getStatus())
+
+    def test_reproducible(self):
+        # page template topics are registered from their files
+        self.root.registerHelpTopic('', 'c', 'Topic C', self._path('help.pt'),
+                                    class_=ZPTOnlineHelpTopic)
+        self.assertIn('d', self.root['c'])
+        filename = os.path.join(self.directory, 'copy.bundle')
+        bundle.buildBundle(filename, self.root)
+        with open(self.filename, 'rb') as f, open(filename, 'rb') as g:
+            self.assertEqual(f.read(), g.read())
+
+    def test_not_a_bundle(self):
+        with open(self.filename, 'wb') as f:
+            f.write(b'garbage' * 10)
+        self.assertRaises(ValueError, bundle.HelpBundle, self.filename)
+
+    def test_directive(self):
+        xmlconfig.string('''
+            <configure xmlns="http://namespaces.zope.org/zope"
+                       xmlns:help="http://namespaces.zope.org/help">
+              <include package="zope.app.onlinehelp" file="meta.zcml" />
+              <help:bundle file="%s" />
+            </configure>''' % self.filename)
+        self.assertEqual('Topic B', globalhelp['a']['b'].title)
+        self.assertEqual(1, len(bundle._bundles))
+        testing.tearDown()
+        self.assertEqual([], bundle._bundles)
+
+    def test_main(self):
+        zcml = os.path.join(os.path.dirname(zope.app.onlinehelp.__file__),
+                            'ftesting.zcml')
+        bundle.main([zcml, self.filename])
+        self.assertTrue(os.path.exists(self.filename))
+
+
+def test_suite():
+    return unittest.defaultTestLoader.loadTestsFromName(__name__)
@@ -0,0 +1,145 @@
+##############################################################################
+#
+# Copyright (c) 2026 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""Test the registration of help directories
+
+"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import zope.traversing
+from zope.component import testing
+from zope.configuration import xmlconfig
+from zope.configuration.exceptions import ConfigurationError
+
+from zope.app.onlinehelp import directory
+from zope.app.onlinehelp import globalhelp
+from zope.app.onlinehelp.onlinehelptopic import ZPTOnlineHelpTopic
+from zope.app.onlinehelp.tests.test_onlinehelp import testdir
+
+
+class TestDirectory(unittest.TestCase):
+
+    def setUp(self):
+        testing.setUp(self)
+        xmlconfig.file('configure.zcml', zope.traversing)
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self._copy('help.txt', 'intro.txt')
+        self._copy('help.rst', 'api.rst')
+        self._copy('test1.png', 'diagram.png')
+        self._copy('help.stx', 'api/views.stx')
+        self._copy('help.pt', 'api/views/page.pt')
+        self._write('manifest.json', {
+            'intro': {'title': 'Introduction',
+                      'resources': ['diagram.png', 'missing.png']}})
+
+    def tearDown(self):
+        testing.tearDown(self)
+
+    def _path(self, name):
+        path = os.path.join(self.directory, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def _copy(self, source, name):
+        shutil.copy(os.path.join(testdir(), source), self._path(name))
+
+    def _write(self, name, data):
+        with open(self._path(name), 'w') as f:
+            json.dump(data, f)
+
+    def test_scanDirectory(self):
+        topics = directory.scanDirectory(self.directory, 'parent')
+        self.assertEqual(
+            [('parent', 'api', 'api', None),
+             ('parent', 'intro', 'Introduction', ('diagram.png',)),
+             ('parent/api', 'views', 'views', None),
+             ('parent/api/views', 'page', 'page', None)],
+            [(parent, id, title, resources and tuple(resources))
+             for parent, id, title, _, _, _, _, resources in topics])
+        self.assertEqual(ZPTOnlineHelpTopic, topics[-1][6])
+        self.assertEqual(os.path.join(self.directory, 'api', 'views.stx'),
+                         topics[2][3])
+
+    def test_register(self):
+        directory.registerHelpDirectory(self.directory)
+        self.assertEqual(['api', 'intro'], sorted(globalhelp.keys()))
+        intro = globalhelp['intro']
+        self.assertEqual('Introduction', intro.title)
+        self.assertIn('diagram.png', intro.keys())
+        self.assertIsInstance(globalhelp['api']['views']['page'],
+                              ZPTOnlineHelpTopic)
+
+    def test_symlink_loop(self):
+        os.symlink(self.directory, self._path('api/views/loop'))
+        self.assertEqual(4, len(directory.scanDirectory(self.directory)))
+
+    def test_domain(self):
+        topics = directory.scanDirectory(self.directory, domain='test')
+        self.assertEqual(['test'] * 4,
+                         [topic[2].domain for topic in topics])
+
+    def test_cached(self):
+        directory.scanDirectory(self.directory)
+        with mock.patch('os.scandir') as scandir:
+            directory.scanDirectory(self.directory)
+        scandir.assert_not_called()
+
+    def test_changed_manifest(self):
+        directory.scanDirectory(self.directory)
+        self._write('manifest.json', {'intro': 'Introduction', 'api': 'API'})
+        # the modification time may not change within its resolution
+        os.utime(self._path('manifest.json'), ns=(0, 0))
+        self.assertEqual(['API', 'Introduction'],
+                         [topic[2] for topic in
+                          directory.scanDirectory(self.directory)[:2]])
+
+    def test_added_file(self):
+        directory.scanDirectory(self.directory)
+        self._copy('help.txt', 'new.txt')
+        os.utime(self.directory, ns=(0, 0))
+        self.assertIn('new', [topic[1] for topic in
+                              directory.scanDirectory(self.directory)])
+
+    def test_same_id(self):
+        self._copy('help.stx', 'intro.stx')
+        self.assertRaises(ConfigurationError,
+                          directory.scanDirectory, self.directory)
+
+    def test_directive(self):
+        xmlconfig.string('''
+            <configure xmlns="http://namespaces.zope.org/zope"
+                       xmlns:help="http://namespaces.zope.org/help"
+                       i18n_domain="zope">
+              <include package="zope.app.onlinehelp" file="meta.zcml" />
+              <help:registerDirectory directory="%s" manifest="none.json" />
+            </configure>''' % self.directory)
+        self.assertEqual('intro', globalhelp['intro'].title)
+        self.assertEqual('zope', globalhelp['intro'].title.domain)
+        self.assertNotIn('diagram.png', globalhelp['intro'])
+        self.assertEqual(['views'], [topic.id for topic in
+                                     globalhelp['api'].getSubTopics()])
+
+    def test_cleanup(self):
+        directory.scanDirectory(self.directory)
+        testing.tearDown(self)
+        self.assertEqual({}, directory._scans)
+
+
+def test_suite():
+    return unittest.defaultTestLoader.loadTestsFromName(__name__)
@@ -74,6 +74,193 @@ class DirectivesTest(testing.PlacelessSetup, unittest.TestCase):
         topic = globalhelp['help1']
         self.assertIn('test1.png', topic.keys())
 
+    def test_probing(self):
+        import threading
+        from unittest import mock
+
+        from zope.configuration.xmlconfig import string
+
+        from zope.app.onlinehelp import onlinehelptopic
+        XMLConfig('configure.zcml', zope.traversing)()
+        threads = []
+        sniffFile = onlinehelptopic._sniffFile
+
+        def _sniffFile(path):
+            threads.append(threading.current_thread().name)
+            return sniffFile(path)
+
+        with mock.patch.object(onlinehelptopic, '_sniffFile', _sniffFile):
+            string('''
+                <configure xmlns="http://namespaces.zope.org/zope"
+                           xmlns:help="http://namespaces.zope.org/help">
+                  <include package="zope.app.onlinehelp" file="meta.zcml" />
+                  <include package="zope.app.onlinehelp.tests"
+                           file="help.zcml" />
+                  <help:probing threads="4" />
+                </configure>''')
+
+        self.assertEqual(['help1', 'help2', 'help3', 'help4', 'help5'],
+                         list(globalhelp.keys()))
+        self.assertIn('test1.png', globalhelp['help1'].keys())
+        self.assertEqual(1, len(threads))
+        self.assertTrue(threads[0].startswith('onlinehelp-probe'))
+        self.assertEqual({}, onlinehelptopic._probes)
+        self.assertIsNone(onlinehelptopic._probeExecutor)
+
+    def test_probing_failure(self):
+        from zope.configuration.exceptions import ConfigurationError
+        from zope.configuration.xmlconfig import string
+
+        from zope.app.onlinehelp import onlinehelptopic
+        XMLConfig('configure.zcml', zope.traversing)()
+        with self.assertRaises(ConfigurationError):
+            string('''
+                <configure xmlns="http://namespaces.zope.org/zope"
+                           xmlns:help="http://namespaces.zope.org/help"
+                           package="zope.app.onlinehelp.tests">
+                  <include package="zope.app.onlinehelp" file="meta.zcml" />
+                  <help:probing threads="2" />
+                  <help:register id="missing" title="Missing"
+                      doc_path="missing.txt" />
+                  <help:register id="help1" title="Help"
+                      doc_path="help.txt" resources="test1.png" />
+                </configure>''')
+        self.assertEqual({}, onlinehelptopic._probes)
+        self.assertIsNone(onlinehelptopic._probeExecutor)
+
+    def test_finish_probing_once(self):
+        from zope.configuration.xmlconfig import string
+
+        from zope.app.onlinehelp.onlinehelptopic import finishProbing
+        XMLConfig('configure.zcml', zope.traversing)()
+        context = string('''
+            <configure xmlns="http://namespaces.zope.org/zope"
+                       xmlns:help="http://namespaces.zope.org/help">
+              <include package="zope.app.onlinehelp" file="meta.zcml" />
+              <include package="zope.app.onlinehelp.tests" file="help.zcml" />
+            </configure>''', execute=False)
+        self.assertEqual(1, len([action for action in context.actions
+                                 if action['callable'] is finishProbing]))
+        context.execute_actions()
+        self.assertEqual(5, len(globalhelp.keys()))
+
+    def _tree(self, topic):
+        return [(name, type(child), self._tree(child)
+                 if hasattr(child, 'values') else None)
+                for name, child in topic.items()]
+
+    def test_lazy(self):
+        from zope.configuration.xmlconfig import string
+        from zope.interface import implementer
+
+        from zope.app.onlinehelp import getTopicFor
+
+        @implementer(I1)
+        class Dummy:
+            pass
+
+        XMLConfig('configure.zcml', zope.traversing)()
+        XMLConfig('help.zcml', tests)()
+        eager = self._tree(globalhelp)
+        testing.tearDown()
+        self.setUp()
+        XMLConfig('configure.zcml', zope.traversing)()
+
+        string('''
+            <configure xmlns="http://namespaces.zope.org/zope"
+                       xmlns:help="http://namespaces.zope.org/help">
+              <include package="zope.app.onlinehelp" file="meta.zcml" />
+              <include package="zope.app.onlinehelp.tests"
+                       file="help.zcml" />
+              <help:lazy />
+            </configure>''')
+        self.assertEqual([], list(globalhelp.keys()))
+        self.assertEqual('help1', getTopicFor(Dummy(), 'view.html').id)
+        self.assertEqual(eager, self._tree(globalhelp))
+
+    def test_lazy_failure(self):
+        import os
+
+        from zope.configuration.exceptions import ConfigurationError
+
+        from zope.app.onlinehelp import materialize
+        from zope.app.onlinehelp import registerGlobalHelpTopic
+        from zope.app.onlinehelp import setLazy
+        XMLConfig('configure.zcml', zope.traversing)()
+        path = os.path.join(os.path.dirname(tests.__file__), 'help.txt')
+        setLazy()
+        registerGlobalHelpTopic('', 'missing', 'Missing', 'missing.txt',
+                                None, None, None, None)
+        registerGlobalHelpTopic('', 'help', 'Help', path,
+                                None, None, None, None)
+        # the failure is raised by every call, not only by the first one
+        for _ in range(2):
+            self.assertRaises(ConfigurationError, materialize)
+            self.assertEqual([], list(globalhelp.keys()))
+
+    def test_topics(self):
+        from zope.configuration.xmlconfig import string
+        XMLConfig('configure.zcml', zope.traversing)()
+        XMLConfig('help.zcml', tests)()
+        eager = self._tree(globalhelp)
+        testing.tearDown()
+        self.setUp()
+        XMLConfig('configure.zcml', zope.traversing)()
+
+        string('''
+            <configure xmlns="http://namespaces.zope.org/zope"
+                       xmlns:help="http://namespaces.zope.org/help"
+                       package="zope.app.onlinehelp.tests">
+              <include package="zope.app.onlinehelp" file="meta.zcml" />
+              <help:topics>
+                <help:topic id="help1" title="Help" doc_path="help.txt"
+                    for=".test_helpdirectives.I1" view="view.html"
+                    resources="test1.png" />
+                <help:topic id="help2" title="Help2" doc_path="help.txt" />
+                <help:topic id="help3" title="Help3" doc_path="help.stx"
+                    class="..onlinehelptopic.STXOnlineHelpTopic" />
+                <help:topic id="help4" title="Help4" doc_path="help.rst"
+                    class="..onlinehelptopic.RESTOnlineHelpTopic" />
+                <help:topic id="help5" title="Help5" doc_path="help.pt"
+                    class="..onlinehelptopic.ZPTOnlineHelpTopic" />
+              </help:topics>
+            </configure>''')
+        self.assertEqual(eager, self._tree(globalhelp))
+
+    def test_topics_conflict(self):
+        from zope.configuration.config import ConfigurationConflictError
+        from zope.configuration.xmlconfig import string
+        with self.assertRaises(ConfigurationConflictError):
+            string('''
+                <configure xmlns="http://namespaces.zope.org/zope"
+                           xmlns:help="http://namespaces.zope.org/help"
+                           package="zope.app.onlinehelp.tests">
+                  <include package="zope.app.onlinehelp" file="meta.zcml" />
+                  <help:register id="help1" title="Help"
+                      doc_path="help.txt" />
+                  <help:topics>
+                    <help:topic id="help1" title="Help"
+                        doc_path="help.txt" />
+                  </help:topics>
+                </configure>''')
+
+    def test_lazy_traverse(self):
+        from zope.configuration.xmlconfig import string
+
+        from zope.app.onlinehelp import helpNamespace
+        XMLConfig('configure.zcml', zope.traversing)()
+        string('''
+            <configure xmlns="http://namespaces.zope.org/zope"
+                       xmlns:help="http://namespaces.zope.org/help">
+              <include package="zope.app.onlinehelp" file="meta.zcml" />
+              <help:lazy />
+              <include package="zope.app.onlinehelp.tests"
+                       file="help.zcml" />
+            </configure>''')
+        self.assertEqual([], list(globalhelp.keys()))
+        onlinehelp = helpNamespace(None).traverse('', None)
+        self.assertEqual(5, len(onlinehelp))
+
 
 def test_suite():
     return unittest.defaultTestLoader.loadTestsFromName(__name__)
@@ -18,6 +18,7 @@ import os
 import re
 import unittest
 from doctest import DocTestSuite
+from unittest import mock
 
 import zope.traversing
 from zope.component import testing
@@ -26,8 +27,10 @@ from zope.interface import Interface
 from zope.interface import implementer
 from zope.testing import renormalizing
 
+from zope.app.onlinehelp import cache
 from zope.app.onlinehelp import onlinehelp
 from zope.app.onlinehelp import onlinehelptopic
+from zope.app.onlinehelp import search
 
 
 class I1(Interface):
@@ -50,6 +53,42 @@ class TestOnlineHelpResource(unittest.TestCase):
             os.path.join(testdir(), 'help.html'))
         self.assertEqual(20, r.getSize())
 
+    def _tmpfile(self, name, data):
+        import shutil
+        import tempfile
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        path = os.path.join(tmpdir, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_large_file(self):
+        data = b'x' * (onlinehelptopic.SNIFF_SIZE * 3)
+        r = onlinehelptopic.OnlineHelpResource(self._tmpfile('big.txt', data))
+        self.assertEqual(len(data), r.getSize())
+        self.assertEqual('text/plain', r.contentType)
+        self.assertEqual(data.decode('ascii'), r.data)
+
+    def test_jpeg_markers_beyond_header(self):
+        data = (b'\xff\xd8\xff\xe0\x00\x10' + b'\x00' * 14
+                + b'\x01' * onlinehelptopic.SNIFF_SIZE
+                + b'\xff\xc0\x00\x11\x08\x00\x10\x00\x20')
+        path = self._tmpfile('image.jpg', data)
+        with mock.patch('builtins.open', wraps=open) as opened:
+            r = onlinehelptopic.OnlineHelpResource(path)
+        # only the header is read
+        self.assertEqual(1, [call.args[0] for call in opened.call_args_list]
+                         .count(path))
+        self.assertEqual('image/jpeg', r.contentType)
+        self.assertEqual(len(data), r.getSize())
+
+    def test_explicit_content_type(self):
+        r = onlinehelptopic.OnlineHelpResource(
+            os.path.join(testdir(), 'help.html'), 'text/plain')
+        self.assertEqual('text/plain', r.contentType)
+        self.assertEqual('r', r._fileMode)
+
 
 class TestBaseOnlineHelpTopic(unittest.TestCase):
 
@@ -76,6 +115,426 @@ class TestOnlineHelp(unittest.TestCase):
             'path that does not exist')
 
 
+class TestLookupTopic(unittest.TestCase):
+
+    def setUp(self):
+        setUp(self)
+        self.onlinehelp = onlinehelp.OnlineHelp('Help', testdir())
+        self.path = os.path.join(testdir(), 'help.txt')
+
+    def tearDown(self):
+        testing.tearDown(self)
+
+    def _register(self, id, interface=I1, view=None):
+        from zope.component import getUtility
+
+        from zope.app.onlinehelp.interfaces import IOnlineHelpTopic
+        self.onlinehelp.registerHelpTopic('', id, id, self.path,
+                                          interface, view)
+        return getUtility(IOnlineHelpTopic, id)
+
+    def test_first_registered_wins(self):
+        first = self._register('first')
+        self._register('second')
+        self.assertIs(first, onlinehelp.lookupTopic(I1))
+        self.assertIsNone(onlinehelp.lookupTopic(I1, 'view.html'))
+        self.assertIsNone(onlinehelp.lookupTopic(Interface))
+
+    def test_reregistration_moves_last(self):
+        # like the utilities, which are scanned in this order
+        self._register('first')
+        second = self._register('second')
+        self._register('first')
+        self.assertIs(second, onlinehelp.lookupTopic(I1))
+        self.assertIs(second, onlinehelp._scanTopics(I1, None))
+
+    def test_reregistration_changes_binding(self):
+        self._register('first', view='view.html')
+        second = self._register('second')
+        first = self._register('first')
+        self.assertIsNone(onlinehelp.lookupTopic(I1, 'view.html'))
+        self.assertIs(second, onlinehelp.lookupTopic(I1))
+        self._register('second', view='view.html')
+        self.assertIs(first, onlinehelp.lookupTopic(I1))
+
+    def test_utility(self):
+        from zope.component import provideUtility
+
+        from zope.app.onlinehelp.interfaces import IOnlineHelpTopic
+        from zope.app.onlinehelp.onlinehelptopic import OnlineHelpTopic
+        self._register('first', view='view.html')
+        topic = OnlineHelpTopic('utility', 'Utility', self.path, '', I1)
+        provideUtility(topic, IOnlineHelpTopic, 'utility')
+        self.assertIs(topic, onlinehelp.lookupTopic(I1))
+        self.assertIs(topic, onlinehelp.lookupProvidedTopic(
+            Dummy1.__implemented__))
+        # registering a topic does not complete the index
+        second = self._register('second', view='other.html')
+        self.assertIs(second, onlinehelp.lookupTopic(I1, 'other.html'))
+        self.assertIs(topic, onlinehelp.lookupTopic(I1))
+
+    def test_local_site(self):
+        from zope.component import getGlobalSiteManager
+        from zope.component.globalregistry import BaseGlobalComponents
+        from zope.component.hooks import resetHooks
+        from zope.component.hooks import setHooks
+        from zope.component.hooks import setSite
+
+        from zope.app.onlinehelp.interfaces import IOnlineHelpTopic
+        from zope.app.onlinehelp.onlinehelptopic import OnlineHelpTopic
+
+        class Site:
+            def getSiteManager(self):
+                return self.sm
+
+        site = Site()
+        site.sm = BaseGlobalComponents('local',
+                                       bases=(getGlobalSiteManager(),))
+        first = self._register('first')
+        topic = OnlineHelpTopic('local', 'Local', self.path, '', I1)
+        site.sm.registerUtility(topic, IOnlineHelpTopic, 'local')
+        setHooks()
+        self.addCleanup(resetHooks)
+        setSite(site)
+        self.addCleanup(setSite)
+        self.assertIs(first, onlinehelp.lookupTopic(I1))
+        self.assertIs(first, onlinehelp.lookupProvidedTopic(
+            Dummy1.__implemented__))
+        self._register('first', view='view.html')
+        self.assertIs(topic, onlinehelp.lookupTopic(I1))
+        self.assertIsNone(onlinehelp.lookupProvidedTopic(
+            Dummy2.__implemented__))
+
+    def test_cleanup(self):
+        self._register('first')
+        testing.tearDown(self)
+        self.assertIsNone(onlinehelp.lookupTopic(I1))
+
+
+class TestLookupProvidedTopic(unittest.TestCase):
+
+    setUp = TestLookupTopic.setUp
+    tearDown = TestLookupTopic.tearDown
+    _register = TestLookupTopic._register
+
+    def _lookup(self, obj, view=None):
+        from zope.interface import providedBy
+        return onlinehelp.lookupProvidedTopic(providedBy(obj), view)
+
+    def test_memoized(self):
+        first = self._register('first')
+        self.assertIs(first, self._lookup(Dummy1()))
+        self.assertIsNone(self._lookup(Dummy2()))
+        self.assertEqual(2, len(onlinehelp._topicsBySpecification))
+        self.assertIs(first, self._lookup(Dummy1()))
+        self.assertEqual(2, len(onlinehelp._topicsBySpecification))
+
+    def test_registration_invalidates(self):
+        self.assertIsNone(self._lookup(Dummy1(), 'view.html'))
+        topic = self._register('first', view='view.html')
+        self.assertIs(topic, self._lookup(Dummy1(), 'view.html'))
+
+    def test_changed_interfaces(self):
+        from zope.interface import classImplements
+
+        class Dummy:
+            pass
+
+        topic = self._register('first')
+        self.assertIsNone(self._lookup(Dummy()))
+        classImplements(Dummy, I1)
+        self.assertIs(topic, self._lookup(Dummy()))
+
+    def test_memo_cleanup(self):
+        self._register('first')
+        self._lookup(Dummy1())
+        testing.tearDown(self)
+        self.assertEqual({}, onlinehelp._topicsBySpecification)
+        self.assertIsNone(self._lookup(Dummy1()))
+
+
+class TestRegisterHelpTopic(unittest.TestCase):
+
+    def setUp(self):
+        setUp(self)
+        self.onlinehelp = onlinehelp.OnlineHelp('Help', testdir())
+        self.path = os.path.join(testdir(), 'help.txt')
+
+    def tearDown(self):
+        testing.tearDown(self)
+
+    def _register(self, parent_path, id):
+        from zope.component import getUtility
+
+        from zope.app.onlinehelp.interfaces import IOnlineHelpTopic
+        self.onlinehelp.registerHelpTopic(parent_path, id, id, self.path)
+        return getUtility(IOnlineHelpTopic,
+                          parent_path + '/' + id if parent_path else id)
+
+    def test_untraversable_parent(self):
+        y = self._register('x', 'y')
+        z = self._register('x/y', 'z')
+        self.assertIs(z, y['z'])
+        x = self._register('', 'x')
+        self.assertIs(x, self.onlinehelp['x'])
+        self.assertIs(y, x['y'])
+
+    def test_children_order(self):
+        for id in ('c', 'a', 'b'):
+            self._register('parent', id)
+        parent = self._register('', 'parent')
+        self.assertEqual(['c', 'a', 'b'], list(parent.keys()))
+
+    def test_reregistered_parent_adopts_children(self):
+        self._register('', 'parent')
+        child = self._register('parent', 'child')
+        parent = self._register('', 'parent')
+        self.assertIs(child, parent['child'])
+
+    def test_cleanup_subtopics(self):
+        from zope.app.onlinehelp import globalhelp
+        globalhelp.registerHelpTopic('', 'a', 'A', self.path)
+        self.assertEqual(['a'], [topic.id
+                                 for topic in globalhelp.getSubTopics()])
+        testing.tearDown(self)
+        self.assertEqual([], list(globalhelp.keys()))
+        self.assertEqual([], globalhelp.getSubTopics())
+
+
+class TestRegisterHelpTopics(unittest.TestCase):
+
+    setUp = TestRegisterHelpTopic.setUp
+    tearDown = TestRegisterHelpTopic.tearDown
+
+    def _state(self):
+        from zope.component import getUtilitiesFor
+
+        from zope.app.onlinehelp.interfaces import IOnlineHelpTopic
+
+        def tree(topic):
+            return [(name, child.title, tree(child))
+                    for name, child in topic.items()
+                    if IOnlineHelpTopic.providedBy(child)]
+
+        return (tree(self.onlinehelp),
+                [(name, topic.title, list(topic.keys()))
+                 for name, topic in getUtilitiesFor(IOnlineHelpTopic)],
+                {path: list(topics)
+                 for path, topics in onlinehelp._topicsByParentPath.items()})
+
+    def _compare(self, *batches):
+        for batch in batches:
+            for args in batch:
+                self.onlinehelp.registerHelpTopic(*args)
+        sequential = self._state()
+        self.tearDown()
+        self.setUp()
+        for batch in batches:
+            self.onlinehelp.registerHelpTopics(batch)
+        self.assertEqual(sequential, self._state())
+
+    def _topics(self, paths):
+        return [tuple(path.rpartition('/')[::2]) + (path, self.path)
+                for path in paths]
+
+    def test_like_sequential(self):
+        self._compare(self._topics(
+            ['c/x', 'a', 'b', 'a/y', 'c', 'missing/z', 'a/y/w', 'a/x']))
+
+    def test_existing_topics(self):
+        self._compare(self._topics(['a', 'b/x', 'a/x']),
+                      self._topics(['a/y', 'b', 'b/w', 'a/x/z']))
+
+    def test_reregistration(self):
+        self._compare(self._topics(['a', 'a/x']),
+                      self._topics(['a/y', 'a', 'a/y', 'a/x/z']))
+
+    def test_missing_files(self):
+        from zope.configuration.exceptions import ConfigurationError
+        with self.assertRaises(ConfigurationError):
+            self.onlinehelp.registerHelpTopics(
+                self._topics(['a']) + [('', 'b', 'B', 'missing.txt')])
+        self.assertEqual({}, onlinehelp._topicsByPath)
+        self.assertEqual([], list(self.onlinehelp.keys()))
+
+
+class TestCompactTopics(unittest.TestCase):
+
+    def setUp(self):
+        setUp(self)
+        self.onlinehelp = onlinehelp.OnlineHelp('Help', testdir())
+        self.path = os.path.join(testdir(), 'help.txt')
+
+    def tearDown(self):
+        testing.tearDown(self)
+
+    def test_default_class(self):
+        from zope.component import getUtility
+        from zope.interface.verify import verifyObject
+
+        from zope.app.onlinehelp.interfaces import IOnlineHelpResource
+        from zope.app.onlinehelp.interfaces import IOnlineHelpTopic
+        from zope.app.onlinehelp.interfaces import ISourceTextOnlineHelpTopic
+        self.onlinehelp.topicClass = onlinehelptopic.CompactOnlineHelpTopic
+        self.onlinehelp.registerHelpTopic(
+            '', 'parent', 'Parent', self.path, I1, resources=['test1.png'])
+        self.onlinehelp.registerHelpTopic('parent', 'child', 'Child',
+                                          self.path)
+        parent = getUtility(IOnlineHelpTopic, 'parent')
+        self.assertIsInstance(parent, onlinehelptopic.CompactOnlineHelpTopic)
+        self.assertTrue(verifyObject(ISourceTextOnlineHelpTopic, parent))
+        self.assertIs(parent, self.onlinehelp['parent'])
+        self.assertIs(parent, onlinehelp.lookupTopic(I1))
+        self.assertIs(parent['child'],
+                      getUtility(IOnlineHelpTopic, 'parent/child'))
+        self.assertEqual([parent['child']], parent.getSubTopics())
+        resource = parent['test1.png']
+        self.assertTrue(verifyObject(IOnlineHelpResource, resource))
+        self.assertIs(parent, resource.__parent__)
+
+    def test_shared_empty_children(self):
+        cls = onlinehelptopic.CompactOnlineHelpTopic
+        first = cls('first', 'First', self.path, '')
+        second = cls('second', 'Second', self.path, '')
+        self.assertIs(first._children, second._children)
+        first['second'] = second
+        self.assertEqual(0, len(onlinehelptopic._NO_CHILDREN))
+        self.assertEqual(['second'], list(first))
+
+    def test_cached_subtopics(self):
+        cls = onlinehelptopic.CompactOnlineHelpTopic
+        parent = cls('parent', 'Parent', self.path, '')
+        self.assertEqual([], parent.getSubTopics())
+        parent.addResources(['test1.png'])
+        parent['child'] = child = cls('child', 'Child', self.path, 'parent')
+        topics = parent.getSubTopics()
+        self.assertEqual([child], topics)
+        self.assertIs(topics[0], parent.getSubTopics()[0])
+        # the cached topics are not changed by the callers
+        topics.append(parent)
+        self.assertEqual([child], parent.getSubTopics())
+        del parent['child']
+        self.assertEqual([], parent.getSubTopics())
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_invalidate(self):
+        c = cache.LRUCache()
+        c.set('a', 1)
+        c.invalidate('a')
+        c.invalidate('missing')
+        self.assertIsNone(c.get('a'))
+
+    def test_clear(self):
+        c = cache.LRUCache()
+        c.set('a', 1)
+        c.clear()
+        self.assertEqual(0, len(c))
+
+    def test_cleanup(self):
+        from zope.testing.cleanup import cleanUp
+        cache.renderCache.set('a', 1)
+        cleanUp()
+        self.assertEqual(0, len(cache.renderCache))
+
+
+class TestSourceCache(unittest.TestCase):
+
+    def setUp(self):
+        import shutil
+        import tempfile
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.addCleanup(cache._clear)
+        self.path = os.path.join(self.tmpdir, 'topic.txt')
+        self._write('one')
+
+    def _write(self, text):
+        with open(self.path, 'w') as f:
+            f.write(text)
+        # make sure the signature changes even on coarse file systems
+        os.utime(self.path, ns=(0, len(text) * 10**9))
+
+    def test_source(self):
+        topic = onlinehelptopic.OnlineHelpTopic('t', 'T', self.path, '')
+        self.assertEqual('one', topic.source)
+        self.assertEqual(1, len(cache.sourceCache))
+        self._write('three')
+        self.assertEqual('three', topic.source)
+
+    def test_resource_data(self):
+        resource = onlinehelptopic.OnlineHelpResource(self.path)
+        self.assertEqual('one', resource.data)
+        self.assertEqual(1, len(cache.sourceCache))
+        self._write('three')
+        self.assertEqual('three', resource.data)
+
+    def test_frozen(self):
+        topic = onlinehelptopic.OnlineHelpTopic('t', 'T', self.path, '')
+        cache.setFrozen()
+        self.assertEqual('one', topic.source)
+        self._write('three')
+        self.assertEqual('one', topic.source)
+        cache.setFrozen(False)
+        self.assertEqual('three', topic.source)
+
+    def test_byte_budget(self):
+        topic = onlinehelptopic.OnlineHelpTopic('t', 'T', self.path, '')
+        self.addCleanup(setattr, cache.sourceCache, 'maxbytes',
+                        cache.sourceCache.maxbytes)
+        cache.sourceCache.maxbytes = 10
+        self.assertEqual('one', topic.source)
+        self.assertEqual(0, len(cache.sourceCache))
+        self.assertEqual(0, cache.sourceCache.nbytes)
+
+
+class TestSearch(unittest.TestCase):
+
+    def setUp(self):
+        setUp(self)
+        self.onlinehelp = onlinehelp.OnlineHelp('Help', testdir())
+
+    def tearDown(self):
+        testing.tearDown(self)
+
+    def _register(self, id, filename, class_=None):
+        self.onlinehelp.registerHelpTopic(
+            '', id, 'Topic', os.path.join(testdir(), filename),
+            class_=class_)
+
+    def test_lazy(self):
+        self._register('txt', 'help.txt')
+        self.assertEqual(1, len(search.searchIndex._pending))
+        self.assertEqual(['txt'], [topic.getTopicPath() for topic
+                                   in search.searchIndex.search('topic')])
+        self.assertEqual(0, len(search.searchIndex._pending))
+
+    def test_markup_is_not_indexed(self):
+        self._register('pt', 'help.pt',
+                       onlinehelptopic.ZPTOnlineHelpTopic)
+        self.assertEqual([], search.searchIndex.search('span'))
+        self.assertEqual(['pt'], [topic.getTopicPath() for topic
+                                  in search.searchIndex.search('ZPT')])
+
+    def test_broken_topic(self):
+        self._register('txt', 'help.txt')
+        self._register('rst', 'help.rst')
+        with mock.patch.object(search, 'topicText',
+                               side_effect=[ValueError, 'Text']), \
+                mock.patch.object(search.logger, 'exception') as exception:
+            self.assertEqual(['rst'], [topic.getTopicPath() for topic
+                                       in search.searchIndex.search('text')])
+        exception.assert_called_once_with(
+            'Cannot index the help topic %s', 'txt')
+        self.assertEqual(2, len(search.searchIndex))
+
+    def test_cleanup(self):
+        self._register('txt', 'help.txt')
+        testing.tearDown(self)
+        self.assertEqual(0, len(search.searchIndex))
+
+
 class TestOnlineHelpNamespace(unittest.TestCase):
 
     def test_context(self):
@@ -120,5 +579,10 @@ def test_suite():
         DocTestSuite('zope.app.onlinehelp.onlinehelp',
                      setUp=setUp, tearDown=testing.tearDown,
                      checker=checker),
+        DocTestSuite('zope.app.onlinehelp.cache'),
+        DocTestSuite('zope.app.onlinehelp.instrumentation'),
+        DocTestSuite('zope.app.onlinehelp.search'),
+        DocTestSuite('zope.app.onlinehelp.browser'),
+        DocTestSuite('zope.app.onlinehelp.browser.resource'),
         unittest.defaultTestLoader.loadTestsFromName(__name__),
     ))
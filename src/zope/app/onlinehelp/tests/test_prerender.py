@@ -0,0 +1,123 @@
+##############################################################################
+#
+# Copyright (c) 2026 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""Test the pre-rendering of the OnlineHelp
+
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+import zope.app.renderer
+from zope.component import testing
+from zope.configuration import xmlconfig
+from zope.publisher.browser import TestRequest
+
+import zope.app.onlinehelp
+from zope.app.onlinehelp import globalhelp
+from zope.app.onlinehelp import prerender
+from zope.app.onlinehelp.browser import OnlineHelpTopicView
+from zope.app.onlinehelp.cache import renderCache
+from zope.app.onlinehelp.testing import OnlineHelpLayer
+
+
+class TestPrerender(unittest.TestCase):
+
+    layer = OnlineHelpLayer
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.addCleanup(prerender._clear)
+        renderCache.clear()
+
+    def _read(self, *path):
+        with open(os.path.join(self.directory, *path), 'rb') as f:
+            return f.read()
+
+    def test_prerender(self):
+        manifest = prerender.prerender(self.directory)
+        self.assertIn('welcome', manifest)
+        self.assertIn('dev/zope.app.onlinehelp', manifest)
+        self.assertEqual('zope.source.rest', manifest['dev']['type'])
+        self.assertIn(b'Welcome', self._read('welcome', 'index.html'))
+        # the root topic, shown when there is no contextual help
+        self.assertEqual(globalhelp.path, manifest['']['path'])
+        self.assertIn(b'Welcome', self._read('index.html'))
+        self.assertIn(b'Online Help', self._read(
+            'dev', 'zope.app.onlinehelp', 'index.html'))
+
+        with open(globalhelp['ui']['mgmt-main-1.png'].path, 'rb') as f:
+            self.assertEqual(f.read(),
+                             self._read('ui', 'mgmt-main-1.png'))
+
+    def test_processes(self):
+        prerender.prerender(self.directory, processes=2)
+        topic = globalhelp['welcome']
+        view = OnlineHelpTopicView(topic, TestRequest())
+        self.assertEqual(view.renderSource(),
+                         self._read('welcome', 'index.html').decode('utf-8'))
+
+    def test_served(self):
+        prerender.prerender(self.directory)
+        with open(os.path.join(self.directory, 'welcome', 'index.html'),
+                  'w') as f:
+            f.write('pre-rendered')
+        prerender.loadPrerendered(self.directory)
+
+        topic = globalhelp['welcome']
+        view = OnlineHelpTopicView(topic, TestRequest())
+        self.assertEqual('pre-rendered', view.topicContent())
+        self.assertIsNotNone(prerender.queryPrerendered(globalhelp))
+
+        # Topics which changed are rendered
+        topic = globalhelp['dev']
+        self.assertIsNotNone(prerender.queryPrerendered(topic))
+        topic.type = 'zope.source.stx'
+        self.addCleanup(setattr, topic, 'type', 'zope.source.rest')
+        self.assertIsNone(prerender.queryPrerendered(topic))
+
+
+class TestMain(unittest.TestCase):
+
+    def setUp(self):
+        testing.setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def tearDown(self):
+        testing.tearDown()
+
+    def test_main(self):
+        zcml = os.path.join(os.path.dirname(zope.app.onlinehelp.__file__),
+                            'ftesting.zcml')
+        prerender.main([zcml, self.directory, '-j', '1'])
+        self.assertTrue(os.path.exists(
+            os.path.join(self.directory, 'welcome', 'index.html')))
+
+    def test_directive(self):
+        # the root topic of globalhelp is rendered
+        xmlconfig.file('configure.zcml', zope.app.renderer)
+        prerender.prerender(self.directory)
+        xmlconfig.string('''
+            <configure xmlns="http://namespaces.zope.org/zope"
+                       xmlns:help="http://namespaces.zope.org/help">
+              <include package="zope.app.onlinehelp" file="meta.zcml" />
+              <help:prerendered directory="%s" />
+            </configure>''' % self.directory)
+        self.assertEqual(self.directory, prerender._directory)
+
+
+def test_suite():
+    return unittest.defaultTestLoader.loadTestsFromName(__name__)
@@ -0,0 +1,180 @@
+##############################################################################
+#
+# Copyright (c) 2026 Zope Foundation and Contributors.
+# All Rights Reserved.
+#
+# This software is subject to the provisions of the Zope Public License,
+# Version 2.1 (ZPL).  A copy of the ZPL should accompany this distribution.
+# THIS SOFTWARE IS PROVIDED "AS IS" AND ANY AND ALL EXPRESS OR IMPLIED
+# WARRANTIES ARE DISCLAIMED, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF TITLE, MERCHANTABILITY, AGAINST INFRINGEMENT, AND FITNESS
+# FOR A PARTICULAR PURPOSE.
+#
+##############################################################################
+"""Test the on-disk store of the OnlineHelp
+
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+import zope.app.renderer
+import zope.traversing
+from zope.component import testing
+from zope.configuration import xmlconfig
+from zope.publisher.browser import TestRequest
+
+import zope.app.onlinehelp
+from zope.app.onlinehelp import globalhelp
+from zope.app.onlinehelp import store
+from zope.app.onlinehelp.browser import OnlineHelpTopicView
+from zope.app.onlinehelp.cache import renderCache
+from zope.app.onlinehelp.onlinehelp import OnlineHelp
+from zope.app.onlinehelp.search import SearchIndex
+from zope.app.onlinehelp.testing import OnlineHelpLayer
+
+
+class TestStore(unittest.TestCase):
+
+    layer = OnlineHelpLayer
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.addCleanup(store._clear)
+        self.filename = os.path.join(self.directory, 'help.store')
+        renderCache.clear()
+
+    def test_build(self):
+        built, copied = store.buildStore(self.filename)
+        self.assertGreater(built, 0)
+        self.assertEqual(0, copied)
+        self.assertEqual((0, built), store.buildStore(self.filename))
+
+        helpstore = store.HelpStore(self.filename)
+        self.addCleanup(helpstore.close)
+        topic = globalhelp['welcome']
+        self.assertIn('Welcome', helpstore.queryHTML(topic))
+        self.assertIn('welcome', helpstore.queryTerms(topic))
+
+    def test_served(self):
+        store.buildStore(self.filename)
+        store.loadStore(self.filename)
+        topic = globalhelp['welcome']
+        key = store._htmlKey(topic.type, store.fileHash(topic.path))
+        view = OnlineHelpTopicView(topic, TestRequest())
+        self.assertEqual(store.getStore().get(key).decode('utf-8'),
+                         view.topicContent())
+
+    def test_not_a_store(self):
+        with open(self.filename, 'wb') as f:
+            f.write(b'garbage' * 10)
+        self.assertRaises(ValueError, store.HelpStore, self.filename)
+
+
+class TestRebuild(unittest.TestCase):
+
+    def setUp(self):
+        testing.setUp()
+        xmlconfig.file('configure.zcml', zope.traversing)
+        xmlconfig.file('configure.zcml', zope.app.renderer)
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.filename = os.path.join(self.directory, 'help.store')
+        self.root = OnlineHelp('Help', self.directory)
+        for id in ('a', 'b'):
+            path = self._write(id, 'Topic %s' % id)
+            self.root.registerHelpTopic('', id, id.upper(), path)
+
+    def tearDown(self):
+        testing.tearDown()
+
+    def _write(self, id, text):
+        path = os.path.join(self.directory, id + '.txt')
+        with open(path, 'w') as f:
+            f.write(text)
+        os.utime(path, ns=(0, len(text) * 10**9))
+        return path
+
+    def test_changed_files_only(self):
+        self.assertEqual((4, 0), store.buildStore(self.filename, self.root))
+        self._write('b', 'Topic b changed')
+        self.assertEqual((2, 2), store.buildStore(self.filename, self.root))
+        helpstore = store.HelpStore(self.filename)
+        self.addCleanup(helpstore.close)
+        self.assertEqual({'topic': 1, 'b': 1, 'changed': 1},
+                         helpstore.queryTerms(self.root['b']))
+
+    def test_changed_file(self):
+        store.buildStore(self.filename, self.root)
+        helpstore = store.HelpStore(self.filename)
+        self.addCleanup(helpstore.close)
+        a, b = self.root['a'], self.root['b']
+        self.assertIsNotNone(helpstore.queryHTML(b))
+        self._write('b', 'Topic b changed')
+        self.assertIsNone(helpstore.queryHTML(b))
+        self.assertIsNone(helpstore.queryTerms(b))
+        os.remove(a.path)
+        self.assertIsNone(helpstore.queryHash(a.path))
+        self.assertIsNone(helpstore.queryHash(os.path.join(self.directory,
+                                                           'c.txt')))
+
+    def test_skipped_and_shared(self):
+        from zope.interface import alsoProvides
+
+        from zope.app.onlinehelp.interfaces import IBundleOnlineHelpTopic
+        from zope.app.onlinehelp.onlinehelptopic import BaseOnlineHelpTopic
+        from zope.app.onlinehelp.onlinehelptopic import ZPTOnlineHelpTopic
+        from zope.app.onlinehelp.tests.test_onlinehelp import testdir
+
+        # a topic of the same file and type shares its entries
+        self.root.registerHelpTopic('', 'c', 'C', self.root['a'].path)
+        # page templates only have search terms
+        self.root.registerHelpTopic('', 'zpt', 'ZPT',
+                                    os.path.join(testdir(), 'help.pt'),
+                                    class_=ZPTOnlineHelpTopic)
+        # custom topics are not stored
+        self.root.registerHelpTopic('', 'base', 'Base', self.root['a'].path,
+                                    class_=BaseOnlineHelpTopic)
+        alsoProvides(self.root['b'], IBundleOnlineHelpTopic)
+        self.assertEqual((3, 0), store.buildStore(self.filename, self.root))
+
+    def test_short_file(self):
+        with open(self.filename, 'wb') as f:
+            f.write(store.MAGIC)
+        self.assertRaises(ValueError, store.HelpStore, self.filename)
+
+    def test_search(self):
+        store.buildStore(self.filename, self.root)
+        store.loadStore(self.filename)
+        # the file is not read if its signature did not change
+        self._write('b', 'Topic x')
+        index = SearchIndex()
+        index.add(self.root['b'])
+        self.assertEqual(['b'], [topic.getTopicPath()
+                                 for topic in index.search('b')])
+
+    def test_main(self):
+        zcml = os.path.join(os.path.dirname(zope.app.onlinehelp.__file__),
+                            'ftesting.zcml')
+        store.main([zcml, self.filename])
+        self.assertTrue(os.path.exists(self.filename))
+
+    def test_directive(self):
+        store.buildStore(self.filename, self.root)
+        store.loadStore(self.filename)
+        old = store.getStore()
+        xmlconfig.string('''
+            <configure xmlns="http://namespaces.zope.org/zope"
+                       xmlns:help="http://namespaces.zope.org/help">
+              <include package="zope.app.onlinehelp" file="meta.zcml" />
+              <help:store file="%s" />
+            </configure>''' % self.filename)
+        self.assertEqual(self.filename, store.getStore().filename)
+        # the store loaded before is replaced
+        self.assertIsNot(old, store.getStore())
+
+
+def test_suite():
+    return unittest.defaultTestLoader.loadTestsFromName(__name__)
@@ -47,7 +47,7 @@ class TestOnlineHelpTopicTreeView(PlacefulSetup, unittest.TestCase):
         treeView = view(self.rootFolder, TestRequest()).getTopicTree
         check_xml(treeView(), util.read_output('test1.xml'))
 
-    def test_topics(self):
+    def _addTopics(self):
         path = os.path.join(testdir(), 'help.txt')
 
         id = 'topic1'
@@ -74,10 +74,85 @@ class TestOnlineHelpTopicTreeView(PlacefulSetup, unittest.TestCase):
         topic2 = OnlineHelpTopic(id, title, path, parentPath)
         self.onlinehelp['topic2'] = topic2
 
+    def test_topics(self):
+        self._addTopics()
         view = OnlineHelpTopicTreeView
         treeView = view(self.rootFolder, TestRequest()).getTopicTree
         check_xml(treeView(), util.read_output('test2.xml'))
 
+    def test_cached(self):
+        from zope.app.onlinehelp.cache import treeCache
+        view = OnlineHelpTopicTreeView(self.rootFolder, TestRequest())
+        check_xml(view.getTopicTree(), util.read_output('test1.xml'))
+        self.assertEqual(1, len(treeCache))
+
+        # Changing the hierarchy invalidates the cached tree
+        self._addTopics()
+        view = OnlineHelpTopicTreeView(self.rootFolder, TestRequest())
+        check_xml(view.getTopicTree(), util.read_output('test2.xml'))
+        self.assertEqual(1, len(treeCache))
+
+    def test_expanded(self):
+        from zope.app.folder import Folder
+        self._addTopics()
+        self.rootFolder['topic1'] = Folder()
+
+        view = OnlineHelpTopicTreeView(self.rootFolder['topic1'],
+                                       TestRequest())
+        tree = view.getTopicTree()
+        self.assertIn('<li class="expand"><a href="/++help++/topic1">', tree)
+        self.assertIn('<li><a href="/++help++/topic2">', tree)
+        # the children of collapsed topics are not rendered
+        self.assertIn('<li><a href="/++help++/topic1/topic1_1">', tree)
+        self.assertIn(
+            '<ul data-children="/++help++/topic1/topic1_1/@@children.json">',
+            tree)
+        self.assertNotIn('topic1_1_1', tree)
+
+        # The cached children are marked for each context
+        view = OnlineHelpTopicTreeView(self.rootFolder, TestRequest())
+        tree = view.getTopicTree()
+        self.assertNotIn('class="expand"', tree)
+        self.assertNotIn('topic1_1', tree)
+
+    def test_bounded(self):
+        from zope.app.folder import Folder
+        path = os.path.join(testdir(), 'help.txt')
+        parent = self.onlinehelp
+        for level in range(3):
+            for n in range(20):
+                topic = OnlineHelpTopic('t%d' % n, 'T', path,
+                                        parent.getTopicPath())
+                parent[topic.id] = topic
+            parent = parent['t0']
+        self.rootFolder['t0'] = Folder()
+
+        view = OnlineHelpTopicTreeView(self.rootFolder['t0'], TestRequest())
+        tree = view.getTopicTree()
+        # the top level topics, the children of t0 and no grandchildren
+        self.assertEqual(40, tree.count('<li'))
+        self.assertNotIn('"/++help++/t0/t0/t0"', tree)
+
+    def test_isExpanded(self):
+        from zope.app.folder import Folder
+        self._addTopics()
+        self.rootFolder['topic1'] = Folder()
+        self.rootFolder['topic1']['topic1_1'] = Folder()
+        context = self.rootFolder['topic1']['topic1_1']
+
+        view = OnlineHelpTopicTreeView(context, TestRequest())
+        topic1 = self.onlinehelp['topic1']
+        self.assertTrue(view.isExpanded(topic1))
+        self.assertTrue(view.isExpanded(topic1['topic1_1']))
+        self.assertFalse(
+            view.isExpanded(topic1['topic1_1']['topic1_1_1']))
+        self.assertFalse(view.isExpanded(self.onlinehelp['topic2']))
+
+    def test_isExpanded_without_location(self):
+        self._addTopics()
+        view = OnlineHelpTopicTreeView(object(), TestRequest())
+        self.assertFalse(view.isExpanded(self.onlinehelp['topic1']))
+
 
 def test_suite():
     return unittest.defaultTestLoader.loadTestsFromName(__name__)